@@ -8,17 +8,22 @@ import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
 import plotly.graph_objects as go
-import sys, os, json, re
+import sys, os, re
 from datetime import datetime, timezone
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from master_data import NAKSHATRAS, RASIS, get_padham_navamsa
-from matching_engine import AstroMatchingEngine
+from master_data import (
+    NAKSHATRAS, RASIS, get_padham_navamsa,
+    get_nakshatra_by_name, get_rasi_by_name,
+)
+from match_cache import cached_calculate_all
+from reverse_index import best_counterpart_stars
+from batch_engine import PORUTHAM_NAMES
 from database import (
     init_db, register_user, login_user, update_user_profile,
     save_horoscope, get_user_horoscopes,
-    save_match_result, get_user_match_history,
+    save_match_result, get_user_match_history_page,
     get_match_by_id, delete_match, get_user_stats
 )
 from pdf_report import generate_pdf
@@ -376,8 +381,12 @@ def rasi_opts():
 
 def sname(o): return o.split(" (")[0]
 def rname(o): return o.split(" (")[0]
-def gstar(n): return next((x for x in NAKSHATRAS if x["name"] == n), {})
-def grasi(n): return next((x for x in RASIS    if x["name"] == n), {})
+def gstar(n): return get_nakshatra_by_name(n) or {}
+def grasi(n): return get_rasi_by_name(n) or {}
+def rasi_index(si, default):
+    """RASI_OPTS index of the star's first rasi (auto-suggestion)."""
+    ri = get_rasi_by_name(si.get("rasi", "").split("/")[0].strip())
+    return ri["id"] - 1 if ri else default
 
 def score_color(p):
     if p >= 75: return "#00C851"
@@ -394,6 +403,23 @@ def fmt_ts(ts) -> str:
         return ts.isoformat()
     return str(ts)
 
+PDF_CACHE_SIZE = 3   # rendered PDFs kept per session; older ones go back to their button
+
+def pdf_button(key: str, label: str, fname: str, get_summary, user):
+    """Render the PDF only when this button is clicked, then offer the download."""
+    pdfs = st.session_state.pdf_cache
+    if key in pdfs:
+        st.download_button(label, pdfs[key], fname, "application/pdf",
+                           key=f"pdf_dl_{key}", use_container_width=True)
+    elif st.button(label, key=f"pdf_make_{key}", use_container_width=True):
+        summary = get_summary()
+        if summary:
+            with st.spinner("Preparing PDF…"):
+                pdfs[key] = generate_pdf(summary, user)
+            while len(pdfs) > PDF_CACHE_SIZE:
+                del pdfs[next(iter(pdfs))]
+            st.rerun()
+
 STAR_OPTS = star_opts()
 RASI_OPTS = rasi_opts()
 
@@ -406,6 +432,8 @@ for k, v in {
     "page":          "login",   # login | register | app | forgot
     "view_match_id": None,
     "calc_result":   None,
+    "pdf_cache":     {},        # pdf_button key → rendered PDF bytes, oldest first
+    "history":       None,      # "Load more" pages: {user_id, after, items, cursor}
     "auth_tab":      "signin",  # signin | register | forgot
 }.items():
     if k not in st.session_state:
@@ -676,7 +704,9 @@ def bar_chart(results):
 # ─────────────────────────────────────────────────────────────
 # ██  MATCH RESULTS RENDERER
 # ─────────────────────────────────────────────────────────────
-def render_results(summary, user, g_padham, b_padham, g_star_n, b_star_n, g_rasi_n, b_rasi_n):
+def render_results(summary, user, g_padham, b_padham, g_star_n, b_star_n, g_rasi_n, b_rasi_n,
+                   pdf_key=None):
+    """pdf_key: pdf_button key for a saved match; None renders the PDF with the page."""
     results = summary["results"]
     pct     = summary["final_percentage"]
     raw_pct = summary["raw_percentage"]
@@ -703,6 +733,11 @@ def render_results(summary, user, g_padham, b_padham, g_star_n, b_star_n, g_rasi
                          summary["bride_star_details"],
                          summary["bride"]["name"], b_padham, b_ri), 280)
 
+    # Older saved matches predate the percentile field
+    if summary.get("percentile") is not None:
+        st.caption(f"📊 This match scores higher than **{summary['percentile']}%** "
+                   f"of all possible star, padham and rasi pairings.")
+
     st.markdown("<br>", unsafe_allow_html=True)
 
     if summary["critical_doshas"]:
@@ -714,11 +749,14 @@ def render_results(summary, user, g_padham, b_padham, g_star_n, b_star_n, g_rasi
     st.markdown("<br>", unsafe_allow_html=True)
     dc1, _ = st.columns([1.5, 5])
     with dc1:
-        pdf_bytes = generate_pdf(summary, user)
-        fname = (f"AstroMatch_{summary['groom']['name']}_{summary['bride']['name']}"
+        g, b = summary["groom"], summary["bride"]
+        fname = (f"AstroMatch_{g['name']}_{b['name']}"
                  f"_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf")
-        st.download_button("📄  Download PDF Report", pdf_bytes, fname,
-                           "application/pdf", use_container_width=True)
+        if pdf_key is None:
+            st.download_button("📄  Download PDF Report", generate_pdf(summary, user), fname,
+                               "application/pdf", use_container_width=True)
+        else:
+            pdf_button(pdf_key, "📄  Download PDF Report", fname, lambda: summary, user)
 
     st.markdown("---")
 
@@ -1160,13 +1198,13 @@ def render_sidebar(user) -> str:
 
         # ── Recent matches ────────────────────────────────
         try:
-            history = get_user_match_history(user["id"])
+            history = get_user_match_history_page(user["id"], limit=4)["items"]
             if history:
                 H("""<div style="padding:0 6px 8px;">
   <div style="font-size:.68rem;color:#6B7280;font-weight:600;
               text-transform:uppercase;letter-spacing:1px;">Recent Matches</div>
 </div>""", 28)
-                for m in history[:4]:
+                for m in history:
                     sc  = score_color(float(m["final_percentage"]))
                     pct = float(m["final_percentage"])
                     ts  = fmt_ts(m["matched_at"])
@@ -1193,8 +1231,9 @@ def render_sidebar(user) -> str:
 
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("Sign Out", use_container_width=True, key="logout_btn"):
-            for k in ["user","page","view_match_id","calc_result"]:
+            for k in ["user","page","view_match_id","calc_result","history"]:
                 st.session_state[k] = None if k != "page" else "login"
+            st.session_state.pdf_cache = {}
             st.rerun()
 
         H(FOOTER_HTML, 46)
@@ -1240,8 +1279,7 @@ def page_new_match(user):
         g_padham_sel  = st.selectbox("🔢 Padham (Quarter)", g_padham_opts, key="gp",
                                       help="Each Nakshatra has 4 Padhams (quarters) of 3°20' each")
         g_padham      = int(g_padham_sel.split()[1])
-        g_rasi_def    = next((i for i,r in enumerate(RASI_OPTS)
-                              if g_si.get("rasi","").split("/")[0].strip() in r), 0)
+        g_rasi_def    = rasi_index(g_si, 0)
         g_rasi_opt    = st.selectbox("♈ Rasi (Moon Sign)", RASI_OPTS, index=g_rasi_def, key="gr",
                                       help="Auto-suggested from Nakshatra. Adjust if star spans 2 Rasis.")
         st.markdown("</div>", unsafe_allow_html=True)
@@ -1268,8 +1306,7 @@ def page_new_match(user):
         b_padham_sel  = st.selectbox("🔢 Padham (Quarter)", b_padham_opts, key="bp",
                                       help="Each Nakshatra has 4 Padhams (quarters) of 3°20' each")
         b_padham      = int(b_padham_sel.split()[1])
-        b_rasi_def    = next((i for i,r in enumerate(RASI_OPTS)
-                              if b_si.get("rasi","").split("/")[0].strip() in r), 3)
+        b_rasi_def    = rasi_index(b_si, 3)
         b_rasi_opt    = st.selectbox("♈ Rasi (Moon Sign)", RASI_OPTS, index=b_rasi_def, key="br",
                                       help="Auto-suggested from Nakshatra.")
         st.markdown("</div>", unsafe_allow_html=True)
@@ -1281,6 +1318,29 @@ def page_new_match(user):
     with pc1: H(star_info_card("Groom's Horoscope","🤵", g_si, groom_name or "Groom", g_padham, g_ri_prev), 280)
     with pc2: H(star_info_card("Bride's Horoscope","👰", b_si, bride_name or "Bride", b_padham, b_ri_prev), 280)
 
+    # Most compatible counterpart stars — served from the precomputed reverse index
+    with st.expander("🔭  Most compatible stars for each party"):
+        fc1, fc2 = st.columns([3, 1.4])
+        with fc1:
+            dosha_free = st.multiselect("Must be dosha-free", PORUTHAM_NAMES, key="rev_dosha_free")
+        with fc2:
+            no_critical = st.checkbox("No critical doshas", key="rev_no_critical")
+
+        def top_stars(si, ri, role):
+            rows = best_counterpart_stars(si["id"], ri["id"], role, limit=10, natural_rasi=True,
+                                          exclude_doshas=dosha_free, exclude_critical=no_critical)
+            return pd.DataFrame([{
+                "Star": r["star_name"], "Rasi": r["rasi_name"],
+                "Score %": r["final_percentage"], "Verdict": r["verdict"],
+            } for r in rows])
+        rc1, rc2 = st.columns(2)
+        with rc1:
+            st.markdown(f"**Brides for {groom_name or 'the groom'}**")
+            st.dataframe(top_stars(g_si, g_ri_prev, "groom"), hide_index=True, use_container_width=True)
+        with rc2:
+            st.markdown(f"**Grooms for {bride_name or 'the bride'}**")
+            st.dataframe(top_stars(b_si, b_ri_prev, "bride"), hide_index=True, use_container_width=True)
+
     st.markdown("<br>", unsafe_allow_html=True)
 
     # Calculate button — full width, prominent
@@ -1305,17 +1365,17 @@ def page_new_match(user):
     b_rasi_n = rname(b_rasi_opt)
 
     with st.spinner("✨ Calculating 10 Poruthams..."):
-        engine  = AstroMatchingEngine(
+        summary = cached_calculate_all(
             {"name": groom_name or "Groom", "star_name": g_star_n, "padham": g_padham, "rasi_name": g_rasi_n},
             {"name": bride_name or "Bride", "star_name": b_star_n, "padham": b_padham, "rasi_name": b_rasi_n}
         )
-        summary = engine.calculate_all()
         st.session_state.calc_result = summary
 
         # Save to DB
         gid = save_horoscope(user["id"], groom_name or "Groom", "Male",   g_star_n, g_padham, g_rasi_n)
         bid = save_horoscope(user["id"], bride_name or "Bride", "Female", b_star_n, b_padham, b_rasi_n)
         mid = save_match_result(user["id"], gid, bid, summary)
+        st.session_state.history = None   # drop the "Load more" pages
 
     st.success(f"✅ Match calculated and saved to your history! (Match #{mid})")
     st.markdown("---")
@@ -1326,6 +1386,8 @@ def page_new_match(user):
 # ─────────────────────────────────────────────────────────────
 # ██  PAGE: MATCH HISTORY
 # ─────────────────────────────────────────────────────────────
+HISTORY_PAGE_SIZE = 20
+
 def page_history(user):
     greeting_banner(user, "Your saved match results")
     H("""
@@ -1372,11 +1434,18 @@ def page_history(user):
             render_results(s, user,
                            match["groom_padham"], match["bride_padham"],
                            match["groom_star"],   match["bride_star"],
-                           match["groom_rasi"],   match["bride_rasi"])
+                           match["groom_rasi"],   match["bride_rasi"],
+                           pdf_key=f"match_{st.session_state.view_match_id}")
         return
 
-    # List all matches
-    history = get_user_match_history(user["id"])
+    # The first page is fetched fresh on every visit so matches saved elsewhere show up;
+    # only the pages appended by "Load more" and their keyset cursor are kept
+    first = get_user_match_history_page(user["id"], HISTORY_PAGE_SIZE)
+    hs = st.session_state.history
+    if hs is None or hs["user_id"] != user["id"] or hs["after"] != first["next_cursor"]:
+        hs = st.session_state.history = {"user_id": user["id"], "after": first["next_cursor"],
+                                         "items": [], "cursor": first["next_cursor"]}
+    history = first["items"] + hs["items"]
     if not history:
         H("""
 <div style="text-align:center;padding:48px 20px;
@@ -1395,7 +1464,7 @@ def page_history(user):
         pct  = float(m["final_percentage"])
         ts   = fmt_ts(m["matched_at"])
         v_sh = m["verdict"].replace("✨","").replace("👍","").replace("🔍","").replace("⚠️","").strip()
-        crit = m["critical_doshas"] if isinstance(m["critical_doshas"], list) else json.loads(m["critical_doshas"])
+        crit = m["critical_doshas"]
         mid  = m["id"]
 
         H(f"""
@@ -1450,15 +1519,22 @@ def page_history(user):
                 st.session_state.view_match_id = mid
                 st.rerun()
         with ac3:
-            m_full = get_match_by_id(mid, user["id"])
-            if m_full:
-                pdf   = generate_pdf(m_full["summary"], user)
-                fname = (f"AstroMatch_{m['groom_name']}_{m['bride_name']}"
-                         f"_{str(m['matched_at'])[:10]}.pdf")
-                st.download_button("📄  PDF", pdf, fname, "application/pdf",
-                                   key=f"pdf_{mid}", use_container_width=True)
+            fname = (f"AstroMatch_{m['groom_name']}_{m['bride_name']}"
+                     f"_{str(m['matched_at'])[:10]}.pdf")
+            pdf_button(f"match_{mid}", "📄  PDF", fname,
+                       lambda mid=mid: (get_match_by_id(mid, user["id"]) or {}).get("summary"),
+                       user)
         st.markdown("<div style='height:2px'></div>", unsafe_allow_html=True)
 
+    if hs["cursor"] is not None:
+        _, lc, _ = st.columns([2, 1.5, 2])
+        with lc:
+            if st.button("Load more", key="history_more", use_container_width=True):
+                page = get_user_match_history_page(user["id"], HISTORY_PAGE_SIZE, hs["cursor"])
+                hs["items"] = hs["items"] + page["items"]
+                hs["cursor"] = page["next_cursor"]
+                st.rerun()
+
 
 # ─────────────────────────────────────────────────────────────
 # ██  PAGE: PROFILE
@@ -0,0 +1,240 @@
+"""
+batch_engine.py — Vectorized N grooms × M brides scoring
+Gathers from the compiled score tables with NumPy fancy indexing, so a whole
+matrix of matches is scored without a Python loop per pair.
+"""
+
+import numpy as np
+
+from master_data import PORUTHAMS, WEIGHT_PROFILES
+from matching_engine import SEVERE_DOSHAS, VERDICTS
+from score_tables import (
+    STAR_SCORES, STAR_DOSHAS, RASI_SCORES, RASI_DOSHAS,
+    RASI_INDEX, WEIGHTS, MAX_WEIGHTED, N_STARS, N_RASIS, N_PORUTHAMS,
+    N_PADHAMS, N_KEYS, STAR_RESULTS, RASI_RESULTS, key_profile,
+)
+
+
+# ─────────────────────────────────────────────────────────────
+# PORUTHAM ORDER + DOSHA BITS
+# Bit i of a dosha mask is set when porutham i (calculate_all() order) has dosha
+# ─────────────────────────────────────────────────────────────
+
+PORUTHAM_NAMES = [r["name"] for r in STAR_RESULTS[0][0]]
+PORUTHAM_NAMES.insert(RASI_INDEX, RASI_RESULTS[0][0]["name"])
+
+DOSHA_BITS = {name: 1 << i for i, name in enumerate(PORUTHAM_NAMES)}
+
+_CELL = STAR_RESULTS[0][0][:RASI_INDEX] + (RASI_RESULTS[0][0],) + STAR_RESULTS[0][0][RASI_INDEX:]
+CRITICAL_MASK = sum(DOSHA_BITS[r["name"]] for r in _CELL if r["is_critical"])
+_POPCOUNT = np.array([bin(m).count("1") for m in range(1 << N_PORUTHAMS)], dtype=np.int8)
+
+
+def dosha_mask_for(names) -> int:
+    """Dosha mask with the bits of the given porutham names set."""
+    mask = 0
+    for name in names:
+        if name not in DOSHA_BITS:
+            raise ValueError(f"Unknown porutham '{name}'.")
+        mask |= DOSHA_BITS[name]
+    return mask
+
+
+def dosha_names(mask: int) -> list:
+    """Porutham names whose bit is set in a dosha mask, in calculate_all() order."""
+    return [name for name in PORUTHAM_NAMES if mask & DOSHA_BITS[name]]
+
+
+# Every (star, padham, rasi) profile in profile_key() order
+ALL_PROFILES = np.array([key_profile(k) for k in range(N_KEYS)], dtype=np.int64)
+
+
+def _star_tensor() -> np.ndarray:
+    """27×27×10 scores with the Rasi slot left at zero."""
+    t = np.zeros((N_STARS, N_STARS, N_PORUTHAMS), dtype=np.int8)
+    star = np.array(STAR_SCORES, dtype=np.int8)
+    t[..., :RASI_INDEX] = star[..., :RASI_INDEX]
+    t[..., RASI_INDEX + 1:] = star[..., RASI_INDEX:]
+    return t
+
+
+def _pack_bits(flags: np.ndarray, positions: list) -> np.ndarray:
+    mask = np.zeros(flags.shape[:-1], dtype=np.uint16)
+    for i, bit in enumerate(positions):
+        mask |= flags[..., i].astype(np.uint16) << bit
+    return mask
+
+
+STAR_SCORE_TENSOR = _star_tensor()
+STAR_DOSHA_MASK = _pack_bits(np.array(STAR_DOSHAS, dtype=bool),
+                             [i for i in range(N_PORUTHAMS) if i != RASI_INDEX])
+RASI_SCORE_TABLE = np.array(RASI_SCORES, dtype=np.int8)
+RASI_DOSHA_MASK = np.array(RASI_DOSHAS, dtype=np.uint16) << RASI_INDEX
+
+
+def _py_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Python's round() elementwise, evaluated once per distinct value."""
+    uniq, inverse = np.unique(values, return_inverse=True)
+    rounded = np.array([round(v, ndigits) for v in uniq.tolist()], dtype=np.float64)
+    return rounded[inverse].reshape(values.shape)
+
+
+def _build_weighted_tables():
+    """
+    Weighted score and final percentage for every (g_star, b_star, g_rasi, b_rasi).
+    Accumulated term by term in calculate_all() order so the floats are bit-identical,
+    then rounded with Python's round() once per distinct value.
+    """
+    rasi = np.broadcast_to(RASI_SCORE_TABLE, (N_STARS, N_STARS, N_RASIS, N_RASIS))
+    weighted = np.zeros((N_STARS, N_STARS, N_RASIS, N_RASIS), dtype=np.float64)
+    for i, w in enumerate(WEIGHTS):
+        term = rasi if i == RASI_INDEX else STAR_SCORE_TENSOR[..., i][:, :, None, None]
+        weighted = weighted + term * w
+    return _py_round(weighted, 2), _py_round((weighted / MAX_WEIGHTED) * 100, 1)
+
+
+WEIGHTED_TABLE, FINAL_PCT_TABLE = _build_weighted_tables()
+
+
+def verdict_codes(scores: np.ndarray, dosha_mask: np.ndarray,
+                  final_percentage: np.ndarray) -> np.ndarray:
+    """
+    Vectorized matching_engine.verdict_code() → uint8 indexes into VERDICTS.
+    Inputs broadcast against each other (e.g. one percentage per weight profile).
+    """
+    n_critical = _POPCOUNT[dosha_mask & CRITICAL_MASK]
+    code = np.full(np.broadcast_shapes(np.shape(dosha_mask), np.shape(final_percentage)),
+                   3, dtype=np.uint8)
+    code[final_percentage >= 50] = 2
+    code[(final_percentage >= 65) & (n_critical <= 1)] = 1
+    code[(final_percentage >= 80) & (n_critical == 0)] = 0
+    # Severe overrides, applied last-to-first so the earliest porutham wins
+    for i, name in reversed(list(enumerate(SEVERE_DOSHAS))):
+        idx = PORUTHAM_NAMES.index(name)
+        severe = ((dosha_mask >> idx) & 1).astype(bool) & (scores[..., idx] == 0)
+        code[np.broadcast_to(severe, code.shape)] = 4 + i
+    return code
+
+
+# ─────────────────────────────────────────────────────────────
+# BATCH API
+# ─────────────────────────────────────────────────────────────
+
+def as_profiles(profiles) -> np.ndarray:
+    """Validate (star_id, padham, rasi_id) rows → int64 array of shape (N, 3)."""
+    arr = np.asarray(profiles, dtype=np.int64)
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if arr.ndim != 2 or arr.shape[1] != 3:
+        raise ValueError("Profiles must be rows of (star_id, padham, rasi_id).")
+    star, padham, rasi = arr[:, 0], arr[:, 1], arr[:, 2]
+    if ((star < 1) | (star > N_STARS)).any():
+        raise ValueError(f"star_id must be between 1 and {N_STARS}.")
+    if ((padham < 1) | (padham > N_PADHAMS)).any():
+        raise ValueError(f"padham must be between 1 and {N_PADHAMS}.")
+    if ((rasi < 1) | (rasi > N_RASIS)).any():
+        raise ValueError(f"rasi_id must be between 1 and {N_RASIS}.")
+    return arr
+
+
+def _score_indexed(gs, bs, gr, br) -> dict:
+    """score_matrix() arrays for broadcastable 0-based star / rasi index arrays."""
+    scores = STAR_SCORE_TENSOR[gs, bs]
+    scores[..., RASI_INDEX] = RASI_SCORE_TABLE[gr, br]
+
+    dosha_mask = STAR_DOSHA_MASK[gs, bs] | RASI_DOSHA_MASK[gr, br]
+    final_percentage = FINAL_PCT_TABLE[gs, bs, gr, br]
+    return {
+        "scores": scores,
+        "dosha_mask": dosha_mask,
+        "raw_score": scores.sum(axis=-1, dtype=np.int16),
+        "weighted_score": WEIGHTED_TABLE[gs, bs, gr, br],
+        "final_percentage": final_percentage,
+        "verdict_code": verdict_codes(scores, dosha_mask, final_percentage),
+    }
+
+
+def score_matrix(grooms, brides) -> dict:
+    """
+    Score every groom against every bride.
+    grooms: (N, 3), brides: (M, 3) array-likes of (star_id, padham, rasi_id).
+
+    Returns a dict of NumPy arrays:
+        scores           (N, M, 10) int8    — per-porutham scores, PORUTHAM_NAMES order
+        dosha_mask       (N, M)     uint16  — DOSHA_BITS of the doshas present
+        raw_score        (N, M)     int16
+        weighted_score   (N, M)     float64 — same value as summary["weighted_score"]
+        final_percentage (N, M)     float64 — same value as summary["final_percentage"]
+        verdict_code     (N, M)     uint8   — index into matching_engine.VERDICTS
+    """
+    g = as_profiles(grooms)
+    b = as_profiles(brides)
+    return _score_indexed(g[:, 0, None] - 1, b[None, :, 0] - 1, g[:, 2, None] - 1, b[None, :, 2] - 1)
+
+
+def score_pairwise(grooms, brides) -> dict:
+    """
+    Score grooms[i] against brides[i] only — score_matrix() arrays with shape (N,)
+    instead of (N, N), for a list of unrelated pairs.
+    """
+    g = as_profiles(grooms)
+    b = as_profiles(brides)
+    if len(g) != len(b):
+        raise ValueError("grooms and brides must have the same length.")
+    return _score_indexed(g[:, 0] - 1, b[:, 0] - 1, g[:, 2] - 1, b[:, 2] - 1)
+
+
+# ─────────────────────────────────────────────────────────────
+# WEIGHT PROFILES
+# WEIGHT_PROFILE_MATRIX is K × 10 (master_data.WEIGHT_PROFILES, columns in
+# PORUTHAM_NAMES order). Scoring is the product scores · Wᵀ, accumulated one
+# porutham at a time so the "default" row is bit-identical to calculate_all().
+# ─────────────────────────────────────────────────────────────
+
+WEIGHT_PROFILE_NAMES = list(WEIGHT_PROFILES)
+_PORUTHAMS_ORDER = [p["name"] for p in PORUTHAMS]
+WEIGHT_PROFILE_MATRIX = np.array(
+    [[WEIGHT_PROFILES[name][_PORUTHAMS_ORDER.index(p)] for p in PORUTHAM_NAMES]
+     for name in WEIGHT_PROFILE_NAMES], dtype=np.float64)
+_MAX_SCORES = [next(p["max_score"] for p in PORUTHAMS if p["name"] == name) for name in PORUTHAM_NAMES]
+PROFILE_MAX_WEIGHTED = np.array(
+    [sum(m * w for m, w in zip(_MAX_SCORES, row)) for row in WEIGHT_PROFILE_MATRIX.tolist()])
+
+
+def score_weight_profiles(scores, dosha_mask) -> dict:
+    """
+    Every weight profile for score vectors at once.
+    scores: (..., 10) as score_matrix()['scores']; dosha_mask: (...) matching.
+    Returns weighted_score, final_percentage and verdict_code arrays of shape (..., K),
+    K following WEIGHT_PROFILE_NAMES.
+    """
+    scores = np.asarray(scores)
+    dosha_mask = np.asarray(dosha_mask)
+    weighted = np.zeros(scores.shape[:-1] + (len(WEIGHT_PROFILE_NAMES),), dtype=np.float64)
+    for i in range(N_PORUTHAMS):
+        weighted = weighted + scores[..., i, None] * WEIGHT_PROFILE_MATRIX[:, i]
+    final_percentage = _py_round((weighted / PROFILE_MAX_WEIGHTED) * 100, 1)
+    return {
+        "weighted_score": _py_round(weighted, 2),
+        "final_percentage": final_percentage,
+        "verdict_code": verdict_codes(scores[..., None, :], dosha_mask[..., None], final_percentage),
+    }
+
+
+def summary_weight_profiles(summary: dict) -> dict:
+    """{profile name: final_percentage, weighted_score and verdict} for one calculate_all() summary."""
+    results = summary["results"]
+    scores = np.array([r["score"] for r in results], dtype=np.int64)
+    dosha_mask = np.array(sum(1 << i for i, r in enumerate(results) if r["dosha"]))
+    m = score_weight_profiles(scores, dosha_mask)
+    out = {}
+    for k, name in enumerate(WEIGHT_PROFILE_NAMES):
+        verdict, verdict_color = VERDICTS[m["verdict_code"][k]]
+        out[name] = {
+            "weighted_score": float(m["weighted_score"][k]),
+            "max_weighted": round(float(PROFILE_MAX_WEIGHTED[k]), 2),
+            "final_percentage": float(m["final_percentage"][k]),
+            "verdict": verdict,
+            "verdict_color": verdict_color,
+        }
+    return out
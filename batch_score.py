@@ -0,0 +1,277 @@
+"""
+batch_score.py — Streaming batch scorer
+Reads groom/bride pairs from a CSV or JSONL file (or stdin) and writes one
+calculate_all() summary per line as JSONL. Reading, scoring and writing are
+chained generators, so memory stays flat however long the input is.
+
+Input rows, either format:
+    CSV    groom_name, groom_star, groom_padham, groom_rasi,
+           bride_name, bride_star, bride_padham, bride_rasi
+    JSONL  the same flat keys, or {"groom": {...}, "bride": {...}} with the
+           engine's own name / star_name / padham / rasi_name keys
+
+Usage:
+    python batch_score.py pairs.csv -o scores.jsonl
+    cat pairs.jsonl | python batch_score.py --fields final_percentage,verdict,groom.name
+    python batch_score.py pairs.jsonl --workers 32 -o scores.jsonl
+    python batch_score.py pairs.csv --exclude-doshas "Rajju Porutham,Nadi Porutham"
+"""
+
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from master_data import get_nakshatra_by_name, get_rasi_by_name
+from score_tables import CompiledMatchingEngine
+from dosha_filters import DoshaFilter
+
+
+# ─────────────────────────────────────────────────────────────
+# READING
+# ─────────────────────────────────────────────────────────────
+
+def _person(row: dict, role: str) -> dict:
+    """Engine-style person dict from a nested or flat (CSV-style) row."""
+    nested = row.get(role)
+    if isinstance(nested, dict):
+        person = {
+            "name": nested.get("name", role.title()),
+            "star_name": nested.get("star_name"),
+            "padham": nested.get("padham", 1),
+            "rasi_name": nested.get("rasi_name"),
+        }
+    else:
+        person = {
+            "name": row.get(f"{role}_name") or role.title(),
+            "star_name": row.get(f"{role}_star"),
+            "padham": row.get(f"{role}_padham") or 1,
+            "rasi_name": row.get(f"{role}_rasi"),
+        }
+    if get_nakshatra_by_name(person["star_name"] or "") is None:
+        raise ValueError(f"Unknown {role} star {person['star_name']!r}")
+    if get_rasi_by_name(person["rasi_name"] or "") is None:
+        raise ValueError(f"Unknown {role} rasi {person['rasi_name']!r}")
+    try:
+        person["padham"] = int(person["padham"])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {role} padham {person['padham']!r}") from None
+    if not 1 <= person["padham"] <= 4:
+        raise ValueError(f"Invalid {role} padham {person['padham']!r}")
+    return person
+
+
+def read_rows(stream, fmt: str):
+    """Yield (line_no, raw row dict) from a CSV or JSONL text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {line_no}: invalid JSON ({e})") from None
+        yield line_no, row
+
+
+def parse_people(row: dict) -> tuple:
+    """(groom, bride) engine dicts for one raw row."""
+    return _person(row, "groom"), _person(row, "bride")
+
+
+def parse_pair(line_no: int, row: dict) -> tuple:
+    """(line_no, groom, bride) for one raw row; errors carry the line number."""
+    try:
+        return (line_no,) + parse_people(row)
+    except ValueError as e:
+        raise ValueError(f"line {line_no}: {e}") from None
+
+
+def read_pairs(stream, fmt: str):
+    """Yield (line_no, groom, bride) from a CSV or JSONL text stream."""
+    for line_no, row in read_rows(stream, fmt):
+        yield parse_pair(line_no, row)
+
+
+# ─────────────────────────────────────────────────────────────
+# SCORING + PROJECTION
+# ─────────────────────────────────────────────────────────────
+
+def parse_fields(spec: str) -> list:
+    """'final_percentage,groom.name' → [['final_percentage'], ['groom', 'name']]."""
+    if not spec:
+        return None
+    return [f.strip().split(".") for f in spec.split(",") if f.strip()]
+
+
+def needs_details(fields) -> bool:
+    """Result details are only rendered when the projection includes them."""
+    return fields is None or any(path[0] == "results" for path in fields)
+
+
+def project(summary: dict, fields) -> dict:
+    """Keep only the requested dotted fields of a summary (list items by index: results.0.score)."""
+    if fields is None:
+        return summary
+    out = {}
+    for path in fields:
+        value = summary
+        for part in path:
+            if isinstance(value, dict):
+                value = value.get(part)
+            elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+                value = value[int(part)]
+            else:
+                value = None
+        out[".".join(path)] = value
+    return out
+
+
+def score_line(groom: dict, bride: dict, fields=None, with_details: bool = True) -> str:
+    """One serialized output line (without the newline)."""
+    summary = CompiledMatchingEngine(groom, bride).calculate_all(with_details)
+    return json.dumps(project(summary, fields), ensure_ascii=False)
+
+
+def passes_filter(groom: dict, bride: dict, dosha_filter) -> bool:
+    """Whether a parsed pair survives the dosha filter (always, without one)."""
+    if not dosha_filter:
+        return True
+    g_star, b_star = get_nakshatra_by_name(groom["star_name"]), get_nakshatra_by_name(bride["star_name"])
+    g_rasi, b_rasi = get_rasi_by_name(groom["rasi_name"]), get_rasi_by_name(bride["rasi_name"])
+    return dosha_filter.passes_pair(g_star["id"], g_rasi["id"], b_star["id"], b_rasi["id"])
+
+
+def score_stream(pairs, fields=None, dosha_filter=None):
+    """Yield one serialized summary per (line_no, groom, bride) passing dosha_filter."""
+    with_details = needs_details(fields)
+    for _, groom, bride in pairs:
+        if passes_filter(groom, bride, dosha_filter):
+            yield score_line(groom, bride, fields, with_details)
+
+
+# ─────────────────────────────────────────────────────────────
+# MULTI-PROCESS SCORING
+# Raw rows go out in chunks; each worker parses, scores and serializes its
+# chunk. At most `workers * IN_FLIGHT_PER_WORKER` chunks are pending, and
+# chunks are collected in submission order so output follows input order.
+# Workers build the compiled tables once, when they import this module
+# (or inherit them from the parent when forked).
+# ─────────────────────────────────────────────────────────────
+
+DEFAULT_CHUNK_SIZE = 2000
+IN_FLIGHT_PER_WORKER = 2
+
+
+def score_chunk(chunk: list, fields=None, dosha_filter=None) -> list:
+    """Serialized summaries for a list of (line_no, raw row)."""
+    with_details = needs_details(fields)
+    return [score_line(groom, bride, fields, with_details)
+            for _, groom, bride in (parse_pair(line_no, row) for line_no, row in chunk)
+            if passes_filter(groom, bride, dosha_filter)]
+
+
+def _chunks(rows, size: int):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_stream_parallel(rows, fields=None, workers: int = 2,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE, dosha_filter=None):
+    """score_stream() over raw (line_no, row) pairs using a process pool."""
+    max_pending = workers * IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for chunk in _chunks(rows, chunk_size):
+                pending.append(pool.submit(score_chunk, chunk, fields, dosha_filter))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def write_lines(lines, out) -> int:
+    n = 0
+    for line in lines:
+        out.write(line)
+        out.write("\n")
+        n += 1
+    return n
+
+
+# ─────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────
+
+def _detect_format(path: str, fmt: str) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score groom/bride pairs to JSONL summaries.")
+    parser.add_argument("input", nargs="?", default="-", help="CSV or JSONL file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default stdout)")
+    parser.add_argument("--format", choices=("csv", "jsonl"),
+                        help="Input format (default: from the file extension, jsonl for stdin)")
+    parser.add_argument("--fields", help="Comma-separated summary fields to keep, e.g. "
+                                         "final_percentage,verdict,groom.name")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Scoring processes (default 1: score in this process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per worker chunk (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--exclude-doshas", help="Comma-separated poruthams that must be dosha-free, "
+                                                 "e.g. \"Rajju Porutham,Nadi Porutham\" (other pairs are skipped)")
+    parser.add_argument("--exclude-critical", action="store_true",
+                        help="Skip pairs with any critical dosha")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be at least 1")
+    try:
+        names = [n.strip() for n in (args.exclude_doshas or "").split(",") if n.strip()]
+        dosha_filter = DoshaFilter(names, args.exclude_critical)
+    except ValueError as e:
+        parser.error(str(e))
+
+    fmt = _detect_format(args.input, args.format)
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    fields = parse_fields(args.fields)
+    try:
+        if args.workers > 1:
+            lines = score_stream_parallel(read_rows(src, fmt), fields, args.workers, args.chunk_size,
+                                          dosha_filter)
+        else:
+            lines = score_stream(read_pairs(src, fmt), fields, dosha_filter)
+        n = write_lines(lines, dst)
+    except ValueError as e:
+        print(f"batch_score: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(f"Scored {n:,} pairs", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+bench_engine.py — Matching engine benchmarks with regression thresholds
+Measures calculate_all() latency (p50/p99), batch throughput, allocations per
+match and cold import time, writes them to JSON and compares against a stored
+baseline. Any metric worse than its threshold fails the run (exit status 1).
+
+    python benchmarks/bench_engine.py                    # run + compare with baseline.json
+    python benchmarks/bench_engine.py --save-baseline    # record this host's baseline
+    python benchmarks/bench_engine.py -o results.json    # also write the results
+    python benchmarks/bench_engine.py --slack 2          # looser thresholds on shared hosts
+
+Latency and throughput depend on the host — record the baseline on the
+machine that runs the comparison.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from master_data import NAKSHATRAS, RASIS, MASTER_DATA_VERSION  # noqa: E402
+from matching_engine import AstroMatchingEngine, ENGINE_VERSION  # noqa: E402
+from score_tables import CompiledMatchingEngine  # noqa: E402
+from batch_engine import ALL_PROFILES, score_matrix  # noqa: E402
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# metric → (direction, allowed relative regression)
+# "lower" metrics fail above baseline × (1 + tolerance), "higher" below baseline × (1 - tolerance)
+THRESHOLDS = {
+    "reference_p50_us":          ("lower", 0.25),
+    "reference_p99_us":          ("lower", 0.50),
+    "compiled_p50_us":           ("lower", 0.25),
+    "compiled_p99_us":           ("lower", 0.50),
+    "reference_pairs_per_sec":   ("higher", 0.20),
+    "vectorized_pairs_per_sec":  ("higher", 0.25),
+    "alloc_blocks_per_match":    ("lower", 0.10),
+    "alloc_peak_bytes_per_match": ("lower", 0.10),
+    "import_master_data_ms":     ("lower", 0.50),
+    "import_matching_engine_ms": ("lower", 0.50),
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# WORKLOAD
+# ─────────────────────────────────────────────────────────────
+
+def random_pairs(n: int, seed: int = 42) -> list:
+    """n reproducible (groom, bride) engine dicts."""
+    rng = random.Random(seed)
+
+    def person(name):
+        return {"name": name, "star_name": rng.choice(NAKSHATRAS)["name"],
+                "padham": rng.randint(1, 4), "rasi_name": rng.choice(RASIS)["name"]}
+    return [(person("Groom"), person("Bride")) for _ in range(n)]
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# ─────────────────────────────────────────────────────────────
+# BENCHMARKS
+# ─────────────────────────────────────────────────────────────
+
+def bench_latency(engine_cls, pairs: list, rounds: int = 3) -> dict:
+    """
+    Per-call calculate_all() latency in microseconds. Like timeit, GC is paused
+    while timing and the best of several rounds is kept, to damp host noise.
+    """
+    for groom, bride in pairs[:200]:
+        engine_cls(groom, bride).calculate_all()
+    clock = time.perf_counter_ns
+    p50 = p99 = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            samples = []
+            for groom, bride in pairs:
+                start = clock()
+                engine_cls(groom, bride).calculate_all()
+                samples.append(clock() - start)
+            samples.sort()
+            p50 = min(p50, _percentile(samples, 0.50))
+            p99 = min(p99, _percentile(samples, 0.99))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {"p50_us": p50 / 1000, "p99_us": p99 / 1000}
+
+
+def bench_throughput(pairs: list, rounds: int = 3) -> float:
+    """Reference engine pairs per second over a sequential batch (best round)."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for groom, bride in pairs:
+            AstroMatchingEngine(groom, bride).calculate_all()
+        best = min(best, time.perf_counter() - start)
+    return len(pairs) / best
+
+
+def bench_vectorized(n_grooms: int = 200, repeat: int = 5) -> float:
+    """score_matrix() pairs per second for n_grooms × all 1296 profiles."""
+    grooms = ALL_PROFILES[:n_grooms]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score_matrix(grooms, ALL_PROFILES)
+        best = min(best, time.perf_counter() - start)
+    return n_grooms * len(ALL_PROFILES) / best
+
+
+def bench_allocations(pairs: list) -> dict:
+    """
+    tracemalloc blocks allocated per match (retained summaries included) and
+    the peak traced bytes of a single call.
+    """
+    for groom, bride in pairs:
+        AstroMatchingEngine(groom, bride).calculate_all()   # warm interned results
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [AstroMatchingEngine(groom, bride).calculate_all() for groom, bride in pairs]
+    after = tracemalloc.take_snapshot()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename")
+                 if stat.count_diff > 0)
+
+    peaks = []
+    for groom, bride in pairs[:500]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        AstroMatchingEngine(groom, bride).calculate_all()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    del kept
+    return {"blocks_per_match": blocks / len(pairs), "peak_bytes_per_match": statistics.median(peaks)}
+
+
+def bench_import(module: str, runs: int = 9) -> float:
+    """Median cold import time in milliseconds, one fresh interpreter per run."""
+    code = (f"import sys, time; sys.path.insert(0, {str(ROOT)!r}); t = time.perf_counter(); "
+            f"import {module}; print((time.perf_counter() - t) * 1000)")
+    times = [float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                  check=True).stdout) for _ in range(runs)]
+    return statistics.median(times)
+
+
+def run(n_pairs: int = 20000) -> dict:
+    pairs = random_pairs(n_pairs)
+    reference = bench_latency(AstroMatchingEngine, pairs)
+    compiled = bench_latency(CompiledMatchingEngine, pairs)
+    allocations = bench_allocations(pairs[:5000])
+    return {
+        "meta": {
+            "engine_version": ENGINE_VERSION,
+            "master_data_version": MASTER_DATA_VERSION,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "n_pairs": n_pairs,
+        },
+        "metrics": {
+            "reference_p50_us": reference["p50_us"],
+            "reference_p99_us": reference["p99_us"],
+            "compiled_p50_us": compiled["p50_us"],
+            "compiled_p99_us": compiled["p99_us"],
+            "reference_pairs_per_sec": bench_throughput(pairs),
+            "vectorized_pairs_per_sec": bench_vectorized(),
+            "alloc_blocks_per_match": allocations["blocks_per_match"],
+            "alloc_peak_bytes_per_match": allocations["peak_bytes_per_match"],
+            "import_master_data_ms": bench_import("master_data"),
+            "import_matching_engine_ms": bench_import("matching_engine"),
+        },
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+# BASELINE COMPARISON
+# ─────────────────────────────────────────────────────────────
+
+def compare(results: dict, baseline: dict, slack: float = 1.0) -> list:
+    """
+    [(metric, baseline, current, change, failed)] for every metric in both runs
+    (run() dicts). slack scales every tolerance (e.g. 2.0 on shared or throttled
+    hosts). Warns when the baseline was recorded for another engine or master
+    data version, since a summary change moves the numbers on its own.
+    """
+    base_meta = baseline.get("meta", {})
+    for key in ("engine_version", "master_data_version"):
+        if base_meta.get(key) != results["meta"][key]:
+            warnings.warn(f"Baseline {key} is {base_meta.get(key)!r}, this run is "
+                          f"{results['meta'][key]!r} — re-record it with --save-baseline "
+                          f"once the change is intended.", stacklevel=2)
+    metrics, baseline = results["metrics"], baseline["metrics"]
+    rows = []
+    for name, (direction, tolerance) in THRESHOLDS.items():
+        if name not in metrics or name not in baseline or not baseline[name]:
+            continue
+        tolerance *= slack
+        base, cur = baseline[name], metrics[name]
+        change = (cur - base) / base
+        failed = change > tolerance if direction == "lower" else change < -tolerance
+        rows.append((name, base, cur, change, failed))
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the matching engine.")
+    parser.add_argument("-n", "--pairs", type=int, default=20000, help="Pairs per latency run")
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--slack", type=float, default=1.0,
+                        help="Multiply every threshold by this factor (noisy hosts)")
+    args = parser.parse_args(argv)
+
+    results = run(args.pairs)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        for name, value in results["metrics"].items():
+            print(f"  {name:28s} {value:14,.2f}")
+        print(f"No baseline at {baseline_path} — run with --save-baseline.")
+        return 0
+
+    rows = compare(results, json.loads(baseline_path.read_text()), args.slack)
+    print(f"  {'metric':28s} {'baseline':>14s} {'current':>14s} {'change':>8s}")
+    for name, base, cur, change, failed in rows:
+        flag = "  REGRESSION" if failed else ""
+        print(f"  {name:28s} {base:14,.2f} {cur:14,.2f} {change:+8.1%}{flag}")
+    failures = [row[0] for row in rows if row[4]]
+    if failures:
+        print(f"FAILED: {len(failures)} metric(s) regressed past threshold: {', '.join(failures)}")
+        return 1
+    print("OK: no regressions past threshold.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+compat_cube.py — Memory-mapped compatibility cube
+Every groom × bride (star, padham, rasi) combination — 1296 × 1296 cells —
+precomputed into one binary file. Workers mmap it read-only so they all share
+one page-cache copy, and a match is a single fixed-offset read.
+
+Build:  python compat_cube.py [path]
+"""
+
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from master_data import MASTER_DATA_VERSION
+from matching_engine import ENGINE_VERSION, VERDICTS
+from score_tables import N_KEYS, N_PORUTHAMS, profile_key
+from batch_engine import ALL_PROFILES, score_matrix
+
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "compat_cube.bin"
+
+# ─────────────────────────────────────────────────────────────
+# FILE LAYOUT (little-endian)
+# Header (64 bytes):
+#   magic 8s | format u16 | engine version u16 | n_keys u16 | record size u16 |
+#   master data version 16s | padding
+# Records, row-major [groom_key][bride_key], 10 bytes each:
+#   scores 5 bytes (two 4-bit scores per byte, PORUTHAM_NAMES order) |
+#   verdict code u8 | dosha mask u16 | final_percentage × 10 u16
+# ─────────────────────────────────────────────────────────────
+
+MAGIC = b"ASTROCUB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHHH16s")
+HEADER_SIZE = 64
+RECORD = struct.Struct("<5sBHH")
+
+CUBE_DTYPE = np.dtype([
+    ("scores", np.uint8, (N_PORUTHAMS // 2,)),
+    ("verdict_code", np.uint8),
+    ("dosha_mask", "<u2"),
+    ("final_pct_x10", "<u2"),
+])
+assert CUBE_DTYPE.itemsize == RECORD.size
+
+
+def _header() -> bytes:
+    head = HEADER.pack(MAGIC, FORMAT_VERSION, ENGINE_VERSION, N_KEYS, RECORD.size,
+                       MASTER_DATA_VERSION.encode("ascii"))
+    return head.ljust(HEADER_SIZE, b"\0")
+
+
+# ─────────────────────────────────────────────────────────────
+# BUILD
+# ─────────────────────────────────────────────────────────────
+
+def build_cube(path=DEFAULT_PATH) -> Path:
+    """Score all N_KEYS × N_KEYS pairs and write the cube atomically."""
+    path = Path(path)
+    m = score_matrix(ALL_PROFILES, ALL_PROFILES)
+    scores = m["scores"].astype(np.uint8)
+
+    records = np.empty((N_KEYS, N_KEYS), dtype=CUBE_DTYPE)
+    records["scores"] = scores[..., 0::2] | (scores[..., 1::2] << 4)
+    records["verdict_code"] = m["verdict_code"]
+    records["dosha_mask"] = m["dosha_mask"]
+    records["final_pct_x10"] = np.rint(m["final_percentage"] * 10).astype(np.uint16)
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_header())
+        f.write(records.tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+# ─────────────────────────────────────────────────────────────
+# LOAD
+# ─────────────────────────────────────────────────────────────
+
+class CompatibilityCube:
+    """Read-only mmap view over a cube file built by build_cube()."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, engine, n_keys, rec_size, data_version = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a compatibility cube (format {FORMAT_VERSION}).")
+        if (engine, data_version.decode("ascii")) != (ENGINE_VERSION, MASTER_DATA_VERSION):
+            self.close()
+            raise ValueError(f"{self.path} is stale — rebuild it with `python compat_cube.py`.")
+        if n_keys != N_KEYS or rec_size != RECORD.size or \
+                len(self._mm) != HEADER_SIZE + n_keys * n_keys * rec_size:
+            self.close()
+            raise ValueError(f"{self.path} is truncated or has an unexpected shape.")
+
+        self.records = np.frombuffer(self._mm, dtype=CUBE_DTYPE, offset=HEADER_SIZE
+                                     ).reshape(N_KEYS, N_KEYS)
+
+    def close(self) -> None:
+        self.records = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, groom_key: int, bride_key: int) -> dict:
+        """One fixed-offset read → scores, dosha mask, verdict and final percentage."""
+        offset = HEADER_SIZE + (groom_key * N_KEYS + bride_key) * RECORD.size
+        packed, code, dosha_mask, pct_x10 = RECORD.unpack_from(self._mm, offset)
+        scores = []
+        for byte in packed:
+            scores += (byte & 0x0F, byte >> 4)
+        verdict, verdict_color = VERDICTS[code]
+        return {
+            "scores": scores,
+            "dosha_mask": dosha_mask,
+            "verdict_code": code,
+            "verdict": verdict,
+            "verdict_color": verdict_color,
+            "final_percentage": pct_x10 / 10,
+        }
+
+    def lookup_profiles(self, groom: tuple, bride: tuple) -> dict:
+        """lookup() by (star_id, padham, rasi_id) tuples."""
+        return self.lookup(profile_key(*groom), profile_key(*bride))
+
+
+if __name__ == "__main__":
+    out = build_cube(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
+    print(f"Wrote {out} ({out.stat().st_size:,} bytes, data version {MASTER_DATA_VERSION})")
@@ -10,6 +10,7 @@ Tables:
   jyotish.horoscope_profiles — saved horoscope data per user
   jyotish.match_results      — full 10-porutham match results
   jyotish.match_poruthams    — individual porutham scores per match
+  jyotish.user_stats         — per-user counters, kept in step with the above
 
 Credentials: loaded from .env (never hardcoded)
 """
@@ -214,6 +215,18 @@ def init_db() -> None:
                 is_critical    BOOLEAN       NOT NULL DEFAULT FALSE
             );
 
+            -- user_stats: one row per user, updated in the same statement that
+            -- saves / deletes a match or horoscope; repair_user_stats() rebuilds it
+            CREATE TABLE IF NOT EXISTS jyotish.user_stats (
+                user_id          INTEGER       PRIMARY KEY
+                                   REFERENCES jyotish.app_users(id) ON DELETE CASCADE,
+                total_matches    INTEGER       NOT NULL DEFAULT 0,
+                score_sum        NUMERIC(14,2) NOT NULL DEFAULT 0,
+                best_score       NUMERIC(6,2)  NOT NULL DEFAULT 0,
+                saved_horoscopes INTEGER       NOT NULL DEFAULT 0,
+                updated_at       TIMESTAMPTZ   NOT NULL DEFAULT NOW()
+            );
+
             -- Indexes
             CREATE INDEX IF NOT EXISTS idx_jyotish_users_username
                 ON jyotish.app_users(username);
@@ -221,14 +234,55 @@ def init_db() -> None:
                 ON jyotish.app_users(email);
             CREATE INDEX IF NOT EXISTS idx_jyotish_profiles_user
                 ON jyotish.horoscope_profiles(user_id);
-            CREATE INDEX IF NOT EXISTS idx_jyotish_matches_user
-                ON jyotish.match_results(user_id);
+            -- superseded by idx_jyotish_matches_user_page (same leading column)
+            DROP INDEX IF EXISTS jyotish.idx_jyotish_matches_user;
             CREATE INDEX IF NOT EXISTS idx_jyotish_matches_time
                 ON jyotish.match_results(matched_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_jyotish_matches_user_page
+                ON jyotish.match_results(user_id, matched_at DESC, id DESC);
             CREATE INDEX IF NOT EXISTS idx_jyotish_poruthams_match
                 ON jyotish.match_poruthams(match_id);
 
             """)
+            _migrate_profile_natural_key(cur)
+            cur.execute("SELECT EXISTS (SELECT 1 FROM jyotish.user_stats) AS filled")
+            if not cur.fetchone()["filled"]:
+                _repair_user_stats(cur, None, fix=True)   # first start: backfill
+
+
+# Natural key of a saved person: the same user saving the same horoscope twice
+# gets the existing row back (see save_horoscope).
+PROFILE_NATURAL_KEY = "user_id, person_name, gender, star_name, padham, rasi_name"
+
+
+def _migrate_profile_natural_key(cur) -> None:
+    """
+    One-off: merge duplicate horoscope_profiles into the oldest row per natural
+    key, repoint match_results at it, then add the unique index. Skipped once
+    the index exists.
+    """
+    cur.execute("SELECT to_regclass('jyotish.uq_jyotish_profiles_natural') AS idx")
+    if cur.fetchone()["idx"] is not None:
+        return
+    cur.execute(f"""
+        CREATE TEMP TABLE profile_dupes ON COMMIT DROP AS
+        SELECT id, keep_id
+        FROM  (SELECT id, MIN(id) OVER (PARTITION BY {PROFILE_NATURAL_KEY}) AS keep_id
+               FROM   jyotish.horoscope_profiles) ranked
+        WHERE  id <> keep_id;
+
+        UPDATE jyotish.match_results mr SET groom_profile_id = d.keep_id
+        FROM   profile_dupes d WHERE mr.groom_profile_id = d.id;
+
+        UPDATE jyotish.match_results mr SET bride_profile_id = d.keep_id
+        FROM   profile_dupes d WHERE mr.bride_profile_id = d.id;
+
+        DELETE FROM jyotish.horoscope_profiles hp
+        USING  profile_dupes d WHERE hp.id = d.id;
+
+        CREATE UNIQUE INDEX uq_jyotish_profiles_natural
+            ON jyotish.horoscope_profiles({PROFILE_NATURAL_KEY});
+    """)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -299,12 +353,25 @@ def update_user_profile(user_id: int, display_name: str, email: str) -> None:
 def save_horoscope(user_id: int, person_name: str, gender: str,
                    star_name: str, padham: int, rasi_name: str,
                    notes: str = "") -> int:
+    """Upsert on the natural key — saving the same person again returns the existing id."""
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO jyotish.horoscope_profiles
-                    (user_id, person_name, gender, star_name, padham, rasi_name, notes)
-                VALUES (%s,%s,%s,%s,%s,%s,%s) RETURNING id
+            cur.execute(f"""
+                WITH h AS (
+                    INSERT INTO jyotish.horoscope_profiles
+                        (user_id, person_name, gender, star_name, padham, rasi_name, notes)
+                    VALUES (%s,%s,%s,%s,%s,%s,%s)
+                    ON CONFLICT ({PROFILE_NATURAL_KEY}) DO UPDATE
+                        SET notes = COALESCE(NULLIF(EXCLUDED.notes, ''), horoscope_profiles.notes)
+                    RETURNING id, user_id, (xmax = 0) AS inserted
+                ), s AS (
+                    INSERT INTO jyotish.user_stats (user_id, saved_horoscopes)
+                    SELECT user_id, 1 FROM h WHERE inserted
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        saved_horoscopes = user_stats.saved_horoscopes + 1,
+                        updated_at       = NOW()
+                )
+                SELECT id FROM h
             """, (user_id, person_name.strip(), gender, star_name, padham, rasi_name, notes))
             return cur.fetchone()["id"]
 
@@ -322,82 +389,189 @@ def get_user_horoscopes(user_id: int) -> list:
 def delete_horoscope(horo_id: int, user_id: int) -> None:
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM jyotish.horoscope_profiles WHERE id=%s AND user_id=%s",
-                (horo_id, user_id))
+            cur.execute("""
+                WITH d AS (
+                    DELETE FROM jyotish.horoscope_profiles WHERE id=%s AND user_id=%s
+                    RETURNING user_id
+                )
+                UPDATE jyotish.user_stats s SET
+                    saved_horoscopes = s.saved_horoscopes - 1,
+                    updated_at       = NOW()
+                FROM d WHERE s.user_id = d.user_id
+            """, (horo_id, user_id))
 
 
 # ─────────────────────────────────────────────────────────────
 # MATCH RESULTS
 # ─────────────────────────────────────────────────────────────
 
+_MATCH_COLUMNS = """
+    user_id, groom_profile_id, bride_profile_id,
+    raw_score, raw_max, raw_percentage,
+    weighted_score, max_weighted, final_percentage,
+    verdict, verdict_color, total_doshas,
+    critical_doshas, minor_doshas,
+    padham_analysis, full_result_json
+"""
+_MATCH_PLACEHOLDERS = "(%s,%s,%s, %s,%s,%s, %s,%s,%s, %s,%s,%s, %s,%s, %s,%s)"
+
+_PORUTHAM_COLUMNS = """
+    match_id, porutham_name, tamil_name, category,
+    score, max_score, percentage,
+    compatibility, details, is_dosha, is_critical
+"""
+_PORUTHAM_PLACEHOLDERS = "(%s,%s,%s, %s,%s,%s, %s,%s,%s,%s)"   # everything but match_id
+
+
+def _match_row(user_id: int, groom_horo_id: int, bride_horo_id: int, summary: dict) -> tuple:
+    return (
+        user_id, groom_horo_id, bride_horo_id,
+        summary["raw_score"], summary["raw_max"], summary["raw_percentage"],
+        summary["weighted_score"], summary["max_weighted"], summary["final_percentage"],
+        summary["verdict"], summary["verdict_color"], summary["total_doshas"],
+        json.dumps(summary["critical_doshas"]),
+        json.dumps(summary["minor_doshas"]),
+        json.dumps(summary["padham_analysis"]),
+        json.dumps(summary),
+    )
+
+
+def _porutham_rows(summary: dict) -> list:
+    """One match_poruthams row per result, without match_id."""
+    return [(
+        r["name"], r["tamil"], r["category"],
+        r["score"], r["max_score"], r["percentage"],
+        r["compatibility"], r["details"], r["dosha"], r["is_critical"],
+    ) for r in summary["results"]]
+
+
+# Adds EXCLUDED's matches to an existing user_stats row
+_STATS_ADD_MATCHES = """
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_matches = user_stats.total_matches + EXCLUDED.total_matches,
+        score_sum     = user_stats.score_sum + EXCLUDED.score_sum,
+        best_score    = GREATEST(user_stats.best_score, EXCLUDED.best_score),
+        updated_at    = NOW()
+"""
+
+
 def save_match_result(user_id: int, groom_horo_id: int,
                       bride_horo_id: int, summary: dict) -> int:
+    """Insert the match, its porutham rows and the stats update in one statement (one round trip)."""
+    rows = _porutham_rows(summary)
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO jyotish.match_results (
-                    user_id, groom_profile_id, bride_profile_id,
-                    raw_score, raw_max, raw_percentage,
-                    weighted_score, max_weighted, final_percentage,
-                    verdict, verdict_color, total_doshas,
-                    critical_doshas, minor_doshas,
-                    padham_analysis, full_result_json
-                ) VALUES (
-                    %s,%s,%s, %s,%s,%s, %s,%s,%s, %s,%s,%s, %s,%s, %s,%s
-                ) RETURNING id
-            """, (
-                user_id, groom_horo_id, bride_horo_id,
-                summary["raw_score"], summary["raw_max"], summary["raw_percentage"],
-                summary["weighted_score"], summary["max_weighted"], summary["final_percentage"],
-                summary["verdict"], summary["verdict_color"], summary["total_doshas"],
-                json.dumps(summary["critical_doshas"]),
-                json.dumps(summary["minor_doshas"]),
-                json.dumps(summary["padham_analysis"]),
-                json.dumps(summary),
-            ))
-            match_id = cur.fetchone()["id"]
-            for r in summary["results"]:
-                cur.execute("""
-                    INSERT INTO jyotish.match_poruthams (
-                        match_id, porutham_name, tamil_name, category,
-                        score, max_score, percentage,
-                        compatibility, details, is_dosha, is_critical
-                    ) VALUES (%s,%s,%s,%s, %s,%s,%s, %s,%s,%s,%s)
-                """, (
-                    match_id, r["name"], r["tamil"], r["category"],
-                    r["score"], r["max_score"], r["percentage"],
-                    r["compatibility"], r["details"], r["dosha"], r["is_critical"],
-                ))
-            return match_id
-
-
-def get_user_match_history(user_id: int) -> list:
+            cur.execute(f"""
+                WITH m AS (
+                    INSERT INTO jyotish.match_results ({_MATCH_COLUMNS})
+                    VALUES {_MATCH_PLACEHOLDERS}
+                    RETURNING id, user_id, final_percentage
+                ), p AS (
+                    INSERT INTO jyotish.match_poruthams ({_PORUTHAM_COLUMNS})
+                    SELECT m.id, v.*
+                    FROM   m, (VALUES {",".join([_PORUTHAM_PLACEHOLDERS] * len(rows))}) AS v
+                ), s AS (
+                    INSERT INTO jyotish.user_stats (user_id, total_matches, score_sum, best_score)
+                    SELECT user_id, 1, final_percentage, final_percentage FROM m
+                    {_STATS_ADD_MATCHES}
+                )
+                SELECT id FROM m
+            """, _match_row(user_id, groom_horo_id, bride_horo_id, summary)
+                 + tuple(x for row in rows for x in row))
+            return cur.fetchone()["id"]
+
+
+def save_match_results_bulk(user_id: int, matches, page_size: int = 1000) -> list:
+    """
+    Save many (groom_horo_id, bride_horo_id, summary) matches in one transaction.
+    Ids are reserved up front with one nextval() query, so parents and children
+    go out as multi-row execute_values() pages instead of a statement per row.
+    Returns the new match ids in input order.
+    """
+    matches = list(matches)
+    if not matches:
+        return []
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute("""
-                SELECT mr.*,
-                       gp.person_name AS groom_name,
-                       gp.star_name   AS groom_star,
-                       gp.rasi_name   AS groom_rasi,
-                       bp.person_name AS bride_name,
-                       bp.star_name   AS bride_star,
-                       bp.rasi_name   AS bride_rasi
-                FROM   jyotish.match_results mr
-                JOIN   jyotish.horoscope_profiles gp ON gp.id = mr.groom_profile_id
-                JOIN   jyotish.horoscope_profiles bp ON bp.id = mr.bride_profile_id
-                WHERE  mr.user_id = %s
-                ORDER  BY mr.matched_at DESC
-            """, (user_id,))
-            result = []
-            for r in cur.fetchall():
-                d = dict(r)
-                d["critical_doshas"] = (d["critical_doshas"] if isinstance(d["critical_doshas"], list)
-                                        else json.loads(d["critical_doshas"]))
-                d["minor_doshas"]    = (d["minor_doshas"] if isinstance(d["minor_doshas"], list)
-                                        else json.loads(d["minor_doshas"]))
-                result.append(d)
-            return result
+                SELECT nextval(pg_get_serial_sequence('jyotish.match_results', 'id')) AS id
+                FROM   generate_series(1, %s)
+            """, (len(matches),))
+            ids = [r["id"] for r in cur.fetchall()]
+            psycopg2.extras.execute_values(
+                cur,
+                f"INSERT INTO jyotish.match_results (id, {_MATCH_COLUMNS}) VALUES %s",
+                [(match_id,) + _match_row(user_id, g, b, summary)
+                 for match_id, (g, b, summary) in zip(ids, matches)],
+                page_size=page_size)
+            psycopg2.extras.execute_values(
+                cur,
+                f"INSERT INTO jyotish.match_poruthams ({_PORUTHAM_COLUMNS}) VALUES %s",
+                [(match_id,) + row
+                 for match_id, (_, _, summary) in zip(ids, matches)
+                 for row in _porutham_rows(summary)],
+                page_size=page_size)
+            cur.execute(f"""
+                INSERT INTO jyotish.user_stats (user_id, total_matches, score_sum, best_score)
+                SELECT %s, COUNT(*), SUM(final_percentage), MAX(final_percentage)
+                FROM   jyotish.match_results WHERE id = ANY(%s)
+                {_STATS_ADD_MATCHES}
+            """, (user_id, ids))
+            return ids
+
+
+_HISTORY_SELECT = """
+    SELECT mr.id, mr.matched_at,
+           mr.final_percentage, mr.verdict, mr.verdict_color,
+           mr.total_doshas, mr.critical_doshas, mr.minor_doshas,
+           gp.person_name AS groom_name,
+           gp.star_name   AS groom_star,
+           gp.rasi_name   AS groom_rasi,
+           bp.person_name AS bride_name,
+           bp.star_name   AS bride_star,
+           bp.rasi_name   AS bride_rasi
+    FROM   jyotish.match_results mr
+    JOIN   jyotish.horoscope_profiles gp ON gp.id = mr.groom_profile_id
+    JOIN   jyotish.horoscope_profiles bp ON bp.id = mr.bride_profile_id
+"""
+
+
+def _history_row(r) -> dict:
+    d = dict(r)
+    d["critical_doshas"] = (d["critical_doshas"] if isinstance(d["critical_doshas"], list)
+                            else json.loads(d["critical_doshas"]))
+    d["minor_doshas"]    = (d["minor_doshas"] if isinstance(d["minor_doshas"], list)
+                            else json.loads(d["minor_doshas"]))
+    return d
+
+
+def get_user_match_history_page(user_id: int, limit: int = 20,
+                                cursor: Optional[tuple] = None) -> dict:
+    """
+    One page of history cards, newest first. cursor is the (matched_at, id)
+    of the last card already shown; pass back next_cursor for the next page
+    (None when there are no more). Served by idx_jyotish_matches_user_page.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1.")
+    if cursor is None:
+        where, params = "WHERE mr.user_id = %s", (user_id,)
+    else:
+        where = "WHERE mr.user_id = %s AND (mr.matched_at, mr.id) < (%s, %s)"
+        params = (user_id, cursor[0], cursor[1])
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(_HISTORY_SELECT + where + """
+                ORDER  BY mr.matched_at DESC, mr.id DESC
+                LIMIT  %s
+            """, params + (limit + 1,))
+            rows = [_history_row(r) for r in cur.fetchall()]
+    items = rows[:limit]
+    more = len(rows) > limit
+    return {
+        "items":       items,
+        "next_cursor": (items[-1]["matched_at"], items[-1]["id"]) if more else None,
+    }
 
 
 def get_match_by_id(match_id: int, user_id: int) -> Optional[dict]:
@@ -436,28 +610,115 @@ def get_match_by_id(match_id: int, user_id: int) -> Optional[dict]:
 def delete_match(match_id: int, user_id: int) -> None:
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM jyotish.match_results WHERE id=%s AND user_id=%s",
-                (match_id, user_id))
+            # best_score only needs a rescan when the deleted match held it
+            cur.execute("""
+                WITH d AS (
+                    DELETE FROM jyotish.match_results WHERE id=%s AND user_id=%s
+                    RETURNING id, user_id, final_percentage
+                )
+                UPDATE jyotish.user_stats s SET
+                    total_matches = s.total_matches - 1,
+                    score_sum     = s.score_sum - d.final_percentage,
+                    best_score    = CASE WHEN d.final_percentage < s.best_score THEN s.best_score
+                                    ELSE COALESCE((SELECT MAX(mr.final_percentage)
+                                                   FROM   jyotish.match_results mr
+                                                   WHERE  mr.user_id = d.user_id AND mr.id <> d.id), 0)
+                                    END,
+                    updated_at    = NOW()
+                FROM d WHERE s.user_id = d.user_id
+            """, (match_id, user_id))
 
 
 def get_user_stats(user_id: int) -> dict:
+    """Sidebar counters — a primary-key lookup on jyotish.user_stats."""
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute("""
-                SELECT COUNT(*)                                  AS total_matches,
-                       ROUND(AVG(final_percentage)::NUMERIC, 1) AS avg_score,
-                       ROUND(MAX(final_percentage)::NUMERIC, 1) AS best_score
-                FROM jyotish.match_results WHERE user_id=%s
+                SELECT total_matches,
+                       ROUND(score_sum / NULLIF(total_matches, 0), 1) AS avg_score,
+                       ROUND(best_score, 1)                          AS best_score,
+                       saved_horoscopes
+                FROM jyotish.user_stats WHERE user_id=%s
             """, (user_id,))
-            r1 = dict(cur.fetchone())
-            cur.execute(
-                "SELECT COUNT(*) AS n FROM jyotish.horoscope_profiles WHERE user_id=%s",
-                (user_id,))
-            r2 = dict(cur.fetchone())
+            r = dict(cur.fetchone() or {})
             return {
-                "total_matches":    int(r1["total_matches"] or 0),
-                "avg_score":        float(r1["avg_score"]   or 0),
-                "best_score":       float(r1["best_score"]  or 0),
-                "saved_horoscopes": int(r2["n"]             or 0),
-            }
\ No newline at end of file
+                "total_matches":    int(r.get("total_matches")    or 0),
+                "avg_score":        float(r.get("avg_score")      or 0),
+                "best_score":       float(r.get("best_score")     or 0),
+                "saved_horoscopes": int(r.get("saved_horoscopes") or 0),
+            }
+
+
+# ─────────────────────────────────────────────────────────────
+# USER STATS REPAIR
+# Recomputes jyotish.user_stats from the source tables. Rows that drifted
+# are returned (stored vs actual) and, with fix=True, overwritten.
+#   python database.py [--check]
+# ─────────────────────────────────────────────────────────────
+
+_STATS_COLUMNS = ("total_matches", "score_sum", "best_score", "saved_horoscopes")
+
+
+def _repair_user_stats(cur, user_id: Optional[int], fix: bool) -> list:
+    cur.execute("""
+        WITH actual AS (
+            SELECT u.id                       AS user_id,
+                   COALESCE(m.n, 0)           AS total_matches,
+                   COALESCE(m.total, 0)       AS score_sum,
+                   COALESCE(m.best, 0)        AS best_score,
+                   COALESCE(h.n, 0)           AS saved_horoscopes
+            FROM   jyotish.app_users u
+            LEFT   JOIN (SELECT user_id, COUNT(*) AS n, SUM(final_percentage) AS total,
+                                MAX(final_percentage) AS best
+                         FROM jyotish.match_results GROUP BY user_id) m ON m.user_id = u.id
+            LEFT   JOIN (SELECT user_id, COUNT(*) AS n
+                         FROM jyotish.horoscope_profiles GROUP BY user_id) h ON h.user_id = u.id
+            WHERE  %(user_id)s::INTEGER IS NULL OR u.id = %(user_id)s
+        ), drift AS (
+            SELECT a.*,
+                   s.total_matches    AS stored_total_matches,
+                   s.score_sum        AS stored_score_sum,
+                   s.best_score       AS stored_best_score,
+                   s.saved_horoscopes AS stored_saved_horoscopes
+            FROM   actual a
+            LEFT   JOIN jyotish.user_stats s ON s.user_id = a.user_id
+            WHERE  (COALESCE(s.total_matches, 0), COALESCE(s.score_sum, 0),
+                    COALESCE(s.best_score, 0), COALESCE(s.saved_horoscopes, 0))
+                   IS DISTINCT FROM
+                   (a.total_matches, a.score_sum, a.best_score, a.saved_horoscopes)
+        ), fixed AS (
+            INSERT INTO jyotish.user_stats (user_id, total_matches, score_sum, best_score, saved_horoscopes)
+            SELECT user_id, total_matches, score_sum, best_score, saved_horoscopes
+            FROM   drift WHERE %(fix)s
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_matches    = EXCLUDED.total_matches,
+                score_sum        = EXCLUDED.score_sum,
+                best_score       = EXCLUDED.best_score,
+                saved_horoscopes = EXCLUDED.saved_horoscopes,
+                updated_at       = NOW()
+        )
+        SELECT * FROM drift ORDER BY user_id
+    """, {"user_id": user_id, "fix": fix})
+    return [{
+        "user_id": r["user_id"],
+        "stored":  {c: r["stored_" + c] for c in _STATS_COLUMNS},
+        "actual":  {c: r[c] for c in _STATS_COLUMNS},
+    } for r in cur.fetchall()]
+
+
+def repair_user_stats(user_id: Optional[int] = None, fix: bool = True) -> list:
+    """Recompute user_stats (one user or all); returns the rows that had drifted."""
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            return _repair_user_stats(cur, user_id, fix)
+
+
+if __name__ == "__main__":
+    import sys
+    check_only = "--check" in sys.argv[1:]
+    drifted = repair_user_stats(fix=not check_only)
+    for d in drifted:
+        print(f"user {d['user_id']}: stored {d['stored']} → actual {d['actual']}")
+    print(f"{len(drifted)} user_stats row(s) drifted"
+          + ("" if check_only or not drifted else " — repaired"))
+    sys.exit(1 if check_only and drifted else 0)
@@ -0,0 +1,170 @@
+"""
+dosha_filters.py — Dosha-free candidate bitsets
+Hard constraints such as "no Nadi, no Rajju, no Vedha dosha" become bitwise
+operations over precomputed bitsets instead of running the engine and
+discarding failures.
+
+Star bitsets:  bit (star_id - 1) over the 27 counterpart stars.
+Key bitsets:   bit profile_key(...) over all 1296 counterpart profiles.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from score_tables import (
+    STAR_RESULTS, STAR_DOSHAS, RASI_RESULTS, RASI_DOSHAS,
+    N_STARS, N_RASIS, N_KEYS, key_profile,
+)
+from batch_engine import (
+    ALL_PROFILES, STAR_DOSHA_MASK, RASI_DOSHA_MASK,
+    DOSHA_BITS, CRITICAL_MASK, PORUTHAM_NAMES, dosha_mask_for,
+)
+
+
+ALL_STARS = (1 << N_STARS) - 1
+ALL_KEYS = (1 << N_KEYS) - 1
+RASI_PORUTHAM = RASI_RESULTS[0][0]["name"]
+STAR_PORUTHAMS = [r["name"] for r in STAR_RESULTS[0][0]]
+
+
+# ─────────────────────────────────────────────────────────────
+# STAR-LEVEL BITSETS (the 9 star-only poruthams)
+# GROOM_STAR_DOSHA[name][g] → bride stars with that dosha against groom star g
+# BRIDE_STAR_DOSHA[name][b] → groom stars with that dosha against bride star b
+# ─────────────────────────────────────────────────────────────
+
+def _star_bitsets():
+    groom_side = {name: [0] * N_STARS for name in STAR_PORUTHAMS}
+    bride_side = {name: [0] * N_STARS for name in STAR_PORUTHAMS}
+    for g in range(N_STARS):
+        for b in range(N_STARS):
+            for name, dosha in zip(STAR_PORUTHAMS, STAR_DOSHAS[g][b]):
+                if dosha:
+                    groom_side[name][g] |= 1 << b
+                    bride_side[name][b] |= 1 << g
+    return groom_side, bride_side
+
+
+def _rasi_bitsets():
+    groom_side, bride_side = [0] * N_RASIS, [0] * N_RASIS
+    for g in range(N_RASIS):
+        for b in range(N_RASIS):
+            if RASI_DOSHAS[g][b]:
+                groom_side[g] |= 1 << b
+                bride_side[b] |= 1 << g
+    return groom_side, bride_side
+
+
+GROOM_STAR_DOSHA, BRIDE_STAR_DOSHA = _star_bitsets()
+GROOM_RASI_DOSHA, BRIDE_RASI_DOSHA = _rasi_bitsets()
+
+
+# ─────────────────────────────────────────────────────────────
+# KEY-LEVEL BITSETS (all 10 poruthams over 1296 profiles)
+# Padham never changes a dosha, so rows are cached per (role, star, rasi)
+# ─────────────────────────────────────────────────────────────
+
+def _dosha_row(star_id: int, rasi_id: int, role: str) -> np.ndarray:
+    """Dosha mask of the person against every counterpart key (uint16, N_KEYS)."""
+    s, r = star_id - 1, rasi_id - 1
+    other_s, other_r = ALL_PROFILES[:, 0] - 1, ALL_PROFILES[:, 2] - 1
+    if role == "groom":
+        return STAR_DOSHA_MASK[s, other_s] | RASI_DOSHA_MASK[r, other_r]
+    return STAR_DOSHA_MASK[other_s, s] | RASI_DOSHA_MASK[other_r, r]
+
+
+def _to_bitset(flags: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+def _from_bitset(bits: int, n: int) -> np.ndarray:
+    raw = np.frombuffer(bits.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:n].astype(bool)
+
+
+@lru_cache(maxsize=None)
+def key_dosha_bitsets(star_id: int, rasi_id: int, role: str = "groom") -> dict:
+    """{porutham name: bitset of counterpart keys with that dosha} for one person."""
+    row = _dosha_row(star_id, rasi_id, role)
+    return {name: _to_bitset((row & DOSHA_BITS[name]) != 0) for name in PORUTHAM_NAMES}
+
+
+def _check_role(role: str) -> None:
+    if role not in ("groom", "bride"):
+        raise ValueError("role must be 'groom' or 'bride'.")
+
+
+# ─────────────────────────────────────────────────────────────
+# FILTER API
+# ─────────────────────────────────────────────────────────────
+
+class DoshaFilter:
+    """
+    A set of poruthams that must be dosha-free.
+    role is the side of the person being matched; results cover the other side.
+    """
+
+    def __init__(self, exclude=(), exclude_critical: bool = False):
+        self.mask = dosha_mask_for(exclude) | (CRITICAL_MASK if exclude_critical else 0)
+        self.poruthams = [name for name in PORUTHAM_NAMES if self.mask & DOSHA_BITS[name]]
+
+    def __bool__(self) -> bool:
+        return bool(self.mask)
+
+    def allowed_stars(self, star_id: int, role: str = "groom") -> int:
+        """Bitset of counterpart stars passing every star-only porutham in the filter."""
+        _check_role(role)
+        if RASI_PORUTHAM in self.poruthams:
+            raise ValueError(f"{RASI_PORUTHAM} depends on rasi — use allowed_keys().")
+        table = GROOM_STAR_DOSHA if role == "groom" else BRIDE_STAR_DOSHA
+        blocked = 0
+        for name in self.poruthams:
+            blocked |= table[name][star_id - 1]
+        return ALL_STARS & ~blocked
+
+    def allowed_rasis(self, rasi_id: int, role: str = "groom") -> int:
+        """Bitset of counterpart rasis passing Rasi Porutham (all rasis if not filtered)."""
+        _check_role(role)
+        if RASI_PORUTHAM not in self.poruthams:
+            return (1 << N_RASIS) - 1
+        table = GROOM_RASI_DOSHA if role == "groom" else BRIDE_RASI_DOSHA
+        return ((1 << N_RASIS) - 1) & ~table[rasi_id - 1]
+
+    def allowed_keys(self, star_id: int, rasi_id: int, role: str = "groom") -> int:
+        """Bitset over all 1296 counterpart profile keys passing the filter."""
+        _check_role(role)
+        bitsets = key_dosha_bitsets(star_id, rasi_id, role)
+        blocked = 0
+        for name in self.poruthams:
+            blocked |= bitsets[name]
+        return ALL_KEYS & ~blocked
+
+    def allowed_key_array(self, star_id: int, rasi_id: int, role: str = "groom") -> np.ndarray:
+        """allowed_keys() as a boolean array indexed by profile key."""
+        return _from_bitset(self.allowed_keys(star_id, rasi_id, role), N_KEYS)
+
+    def passes(self, dosha_mask):
+        """Apply the filter to score_matrix()['dosha_mask'] (array) or a single mask."""
+        return (dosha_mask & self.mask) == 0
+
+    def passes_pair(self, groom_star: int, groom_rasi: int, bride_star: int, bride_rasi: int) -> bool:
+        """Whether one groom / bride pair passes, from the dosha tables alone (no scoring)."""
+        mask = STAR_DOSHA_MASK[groom_star - 1, bride_star - 1] | RASI_DOSHA_MASK[groom_rasi - 1, bride_rasi - 1]
+        return not int(mask) & self.mask
+
+
+def bitset_members(bits: int) -> list:
+    """Indexes of the set bits, ascending (star_id - 1, rasi_id - 1 or profile keys)."""
+    out = []
+    while bits:
+        low = bits & -bits
+        out.append(low.bit_length() - 1)
+        bits ^= low
+    return out
+
+
+def allowed_profiles(dosha_filter: DoshaFilter, star_id: int, rasi_id: int,
+                     role: str = "groom") -> list:
+    """Counterpart (star_id, padham, rasi_id) profiles passing the filter."""
+    return [key_profile(k) for k in bitset_members(dosha_filter.allowed_keys(star_id, rasi_id, role))]
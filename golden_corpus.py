@@ -0,0 +1,367 @@
+"""
+golden_corpus.py — Exhaustive golden corpus for differential engine checks
+Every groom × bride (star, padham, rasi) combination — 1296 × 1296 cells — is
+run once through the reference AstroMatchingEngine and stored as a compact
+record: the numeric outcome (scores, dosha mask, percentage, verdict) plus an
+8-byte digest of the whole summary. Alternative engines (compiled, vectorized,
+cached, cube) are then checked against the corpus cell by cell, and the first
+divergence is reported.
+
+    python golden_corpus.py build [--workers N]
+    python golden_corpus.py check compiled|cached|reference|batch|cube [--workers N]
+    python golden_corpus.py check compiled --sample 32     # quick CI run
+
+On one core, build takes about 105 s and a full summary check (reference,
+compiled, cached) about 60 s; --workers splits the rows across processes.
+--sample checks that many seeded random groom rows (1296 cells each) instead
+of all 1296. The batch and cube checks always sweep every cell (under a second).
+"""
+
+import argparse
+import hashlib
+import marshal
+import os
+import random
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from master_data import NAKSHATRAS, RASIS, MASTER_DATA_VERSION
+from matching_engine import AstroMatchingEngine, ENGINE_VERSION, VERDICTS
+from score_tables import N_KEYS, N_PORUTHAMS, key_profile
+
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "golden_corpus.bin"
+
+# ─────────────────────────────────────────────────────────────
+# FILE LAYOUT (little-endian)
+# Header (64 bytes):
+#   magic 8s | format u16 | engine version u16 | n_keys u16 | record size u16 |
+#   master data version 16s | padding
+# Records, row-major [groom_key][bride_key], 18 bytes each:
+#   scores 5 bytes (two 4-bit scores per byte, calculate_all() order) |
+#   verdict code u8 | dosha mask u16 | final_percentage × 10 u16 | digest 8s
+# ─────────────────────────────────────────────────────────────
+
+MAGIC = b"ASTROGLD"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHHH16s")
+HEADER_SIZE = 64
+DIGEST_SIZE = 8
+
+GOLDEN_DTYPE = np.dtype([
+    ("scores", np.uint8, (N_PORUTHAMS // 2,)),
+    ("verdict_code", np.uint8),
+    ("dosha_mask", "<u2"),
+    ("final_pct_x10", "<u2"),
+    ("digest", np.uint8, (DIGEST_SIZE,)),
+])
+
+
+def _header() -> bytes:
+    head = HEADER.pack(MAGIC, FORMAT_VERSION, ENGINE_VERSION, N_KEYS, GOLDEN_DTYPE.itemsize,
+                       MASTER_DATA_VERSION.encode("ascii"))
+    return head.ljust(HEADER_SIZE, b"\0")
+
+
+# One shared person dict per profile key and role, so every engine sees the same inputs
+def _person(key: int, name: str) -> dict:
+    star, padham, rasi = key_profile(key)
+    return {"name": name, "star_name": NAKSHATRAS[star - 1]["name"],
+            "padham": padham, "rasi_name": RASIS[rasi - 1]["name"]}
+
+
+GROOMS = [_person(k, "Groom") for k in range(N_KEYS)]
+BRIDES = [_person(k, "Bride") for k in range(N_KEYS)]
+
+
+# ─────────────────────────────────────────────────────────────
+# SUMMARY DIGEST
+# Defined structurally: nested dicts hash on their marshal (v2, value-only)
+# bytes, lists of dicts on their members' digests, scalars on their marshal
+# bytes. Engines share most nested dicts (interned results, master data rows),
+# so nested digests are memoized by identity — the memo keeps each object
+# alive, so an id is never reused while it is cached.
+# ─────────────────────────────────────────────────────────────
+
+_digest_memo: dict = {}
+_MEMO_LIMIT = 200_000
+
+
+def _h(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+def _dict_digest(d: dict) -> bytes:
+    hit = _digest_memo.get(id(d))
+    if hit is not None and hit[0] is d:
+        return hit[1]
+    digest = _h(marshal.dumps(d, 2))
+    if len(_digest_memo) >= _MEMO_LIMIT:
+        _digest_memo.clear()
+    _digest_memo[id(d)] = (d, digest)
+    return digest
+
+
+def summary_digest(summary: dict) -> bytes:
+    """8-byte digest of a calculate_all() summary (keys, order and every value)."""
+    parts = [marshal.dumps(tuple(summary), 2)]
+    for value in summary.values():
+        if type(value) is dict:
+            parts.append(_dict_digest(value))
+        elif type(value) is list and value and type(value[0]) is dict:
+            parts.append(_h(b"".join(_dict_digest(v) for v in value)))
+        else:
+            parts.append(marshal.dumps(value, 2))
+    return _h(b"".join(parts))
+
+
+_VERDICT_CODE = {pair: code for code, pair in enumerate(VERDICTS)}
+
+
+def summary_record(summary: dict) -> tuple:
+    """(packed scores, verdict code, dosha mask, final_pct × 10, digest) for one summary."""
+    results = summary["results"]
+    scores = [r["score"] for r in results]
+    packed = bytes(scores[i] | (scores[i + 1] << 4) for i in range(0, N_PORUTHAMS, 2))
+    dosha_mask = sum(1 << i for i, r in enumerate(results) if r["dosha"])
+    code = _VERDICT_CODE[(summary["verdict"], summary["verdict_color"])]
+    return packed, code, dosha_mask, round(summary["final_percentage"] * 10), summary_digest(summary)
+
+
+# ─────────────────────────────────────────────────────────────
+# BUILD
+# ─────────────────────────────────────────────────────────────
+
+_RECORD = struct.Struct(f"<5sBHH{DIGEST_SIZE}s")
+assert _RECORD.size == GOLDEN_DTYPE.itemsize
+
+
+def _build_row(groom_key: int) -> bytes:
+    groom = GROOMS[groom_key]
+    return b"".join(_RECORD.pack(*summary_record(AstroMatchingEngine(groom, bride).calculate_all()))
+                    for bride in BRIDES)
+
+
+def build_corpus(path=DEFAULT_PATH, workers: int = 1) -> Path:
+    """Run all N_KEYS × N_KEYS cells through the reference engine and write the corpus."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_header())
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for row in pool.map(_build_row, range(N_KEYS), chunksize=8):
+                    f.write(row)
+        else:
+            for groom_key in range(N_KEYS):
+                f.write(_build_row(groom_key))
+    os.replace(tmp, path)
+    return path
+
+
+def load_corpus(path=DEFAULT_PATH) -> np.ndarray:
+    """Memory-mapped (N_KEYS, N_KEYS) GOLDEN_DTYPE view of a corpus file."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        magic, fmt, engine, n_keys, rec_size, data_version = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a golden corpus (format {FORMAT_VERSION}).")
+    if (engine, data_version.decode("ascii")) != (ENGINE_VERSION, MASTER_DATA_VERSION):
+        raise ValueError(f"{path} was built from a different engine or master data — "
+                         f"rebuild it with `python golden_corpus.py build`.")
+    if n_keys != N_KEYS or rec_size != GOLDEN_DTYPE.itemsize or \
+            path.stat().st_size != HEADER_SIZE + n_keys * n_keys * rec_size:
+        raise ValueError(f"{path} is truncated or has an unexpected shape.")
+    return np.memmap(path, dtype=GOLDEN_DTYPE, mode="r", offset=HEADER_SIZE, shape=(N_KEYS, N_KEYS))
+
+
+# ─────────────────────────────────────────────────────────────
+# DIFFERENTIAL CHECKS
+# ─────────────────────────────────────────────────────────────
+
+def _divergence(groom_key: int, bride_key: int, fields: list) -> dict:
+    return {
+        "groom_key": groom_key,
+        "bride_key": bride_key,
+        "groom": key_profile(groom_key),
+        "bride": key_profile(bride_key),
+        "fields": fields,
+    }
+
+
+def _summary_diff(expected: dict, actual: dict) -> list:
+    """Top-level summary keys (and porutham names) that differ."""
+    if list(expected) != list(actual):
+        return ["<keys>"]
+    fields = []
+    for key, value in expected.items():
+        if key == "results" and len(value) == len(actual[key]):
+            fields += [f"results[{r['name']}]" for r, a in zip(value, actual[key]) if r != a]
+        elif value != actual[key]:
+            fields.append(key)
+    return fields or ["<digest>"]
+
+
+_open_corpora: dict = {}
+
+
+def _corpus(path) -> np.ndarray:
+    """load_corpus() once per process and path."""
+    key = str(path)
+    if key not in _open_corpora:
+        _open_corpora[key] = load_corpus(path)
+    return _open_corpora[key]
+
+
+def _check_row(args) -> dict:
+    path, make_engine, groom_key = args
+    expected = _corpus(path)[groom_key]["digest"]
+    groom = GROOMS[groom_key]
+    for bride_key, bride in enumerate(BRIDES):
+        summary = make_engine(groom, bride).calculate_all()
+        if summary_digest(summary) != expected[bride_key].tobytes():
+            reference = AstroMatchingEngine(groom, bride).calculate_all()
+            return _divergence(groom_key, bride_key, _summary_diff(reference, summary))
+    return None
+
+
+def sample_rows(n: int, seed: int = 0) -> list:
+    """n distinct groom keys, reproducible for a given seed."""
+    if not 1 <= n <= N_KEYS:
+        raise ValueError(f"sample must be between 1 and {N_KEYS}.")
+    return sorted(random.Random(seed).sample(range(N_KEYS), n))
+
+
+def check_summaries(make_engine, path=DEFAULT_PATH, groom_keys=None, workers: int = 1) -> dict:
+    """
+    Compare make_engine(groom, bride).calculate_all() with the corpus digest of
+    every cell (or only the rows in groom_keys). Returns the first divergence in
+    (groom_key, bride_key) order, or None. make_engine must be picklable for workers > 1.
+    """
+    _corpus(path)   # validate once up front
+    rows = range(N_KEYS) if groom_keys is None else sorted(groom_keys)
+    tasks = ((path, make_engine, k) for k in rows)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for hit in pool.map(_check_row, tasks, chunksize=4):
+                if hit is not None:
+                    return hit
+        return None
+    for hit in map(_check_row, tasks):
+        if hit is not None:
+            return hit
+    return None
+
+
+def check_arrays(score_fn, path=DEFAULT_PATH, block: int = 64) -> dict:
+    """
+    Compare a vectorized scorer — score_fn(grooms, brides) returning a dict
+    like batch_engine.score_matrix() — with the numeric corpus fields.
+    """
+    corpus = _corpus(path)
+    profiles = np.array([key_profile(k) for k in range(N_KEYS)], dtype=np.int64)
+    for start in range(0, N_KEYS, block):
+        stop = min(start + block, N_KEYS)
+        expected = corpus[start:stop]
+        m = score_fn(profiles[start:stop], profiles)
+        scores = np.asarray(m["scores"]).astype(np.uint8)
+        mismatches = {
+            "scores": ((scores[..., 0::2] | (scores[..., 1::2] << 4)) != expected["scores"]).any(axis=-1),
+            "dosha_mask": np.asarray(m["dosha_mask"]) != expected["dosha_mask"],
+            "final_percentage": np.rint(np.asarray(m["final_percentage"]) * 10) != expected["final_pct_x10"],
+            "verdict_code": np.asarray(m["verdict_code"]) != expected["verdict_code"],
+        }
+        bad = np.logical_or.reduce(list(mismatches.values()))
+        if bad.any():
+            g, b = np.argwhere(bad)[0]
+            return _divergence(start + int(g), int(b),
+                               [name for name, flags in mismatches.items() if flags[g, b]])
+    return None
+
+
+# ─────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────
+
+def _cube_scores(grooms, brides) -> dict:
+    from compat_cube import CompatibilityCube
+    from score_tables import profile_key
+    cube = _cube_scores.cube = getattr(_cube_scores, "cube", None) or CompatibilityCube()
+    gk = np.array([profile_key(*p) for p in grooms.tolist()])
+    bk = np.array([profile_key(*p) for p in brides.tolist()])
+    rec = cube.records[gk[:, None], bk[None, :]]
+    scores = np.empty(rec.shape + (N_PORUTHAMS,), dtype=np.uint8)
+    scores[..., 0::2] = rec["scores"] & 0x0F
+    scores[..., 1::2] = rec["scores"] >> 4
+    return {"scores": scores, "dosha_mask": rec["dosha_mask"],
+            "final_percentage": rec["final_pct_x10"] / 10, "verdict_code": rec["verdict_code"]}
+
+
+class _CachedEngine:
+    """Engine-shaped adapter over the process-wide match cache."""
+
+    def __init__(self, groom: dict, bride: dict):
+        self.groom, self.bride = groom, bride
+
+    def calculate_all(self, with_details: bool = True) -> dict:
+        from match_cache import cached_calculate_all
+        return cached_calculate_all(self.groom, self.bride, with_details)
+
+
+def _summary_engine(name: str):
+    if name == "reference":
+        return AstroMatchingEngine
+    if name == "compiled":
+        from score_tables import CompiledMatchingEngine
+        return CompiledMatchingEngine
+    return _CachedEngine
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Golden corpus for differential engine checks.")
+    parser.add_argument("command", choices=("build", "check"))
+    parser.add_argument("engine", nargs="?", default="compiled",
+                        choices=("reference", "compiled", "cached", "batch", "cube"))
+    parser.add_argument("--path", default=str(DEFAULT_PATH))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--sample", type=int, metavar="ROWS",
+                        help="Check only this many random groom rows (summary engines)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --sample")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        out = build_corpus(args.path, args.workers)
+        print(f"Wrote {out} ({out.stat().st_size:,} bytes, data version {MASTER_DATA_VERSION})")
+        return 0
+
+    if args.engine == "batch":
+        from batch_engine import score_matrix
+        hit = check_arrays(score_matrix, args.path)
+    elif args.engine == "cube":
+        hit = check_arrays(_cube_scores, args.path)
+    else:
+        rows = None
+        if args.sample is not None:
+            try:
+                rows = sample_rows(args.sample, args.seed)
+            except ValueError as e:
+                parser.error(str(e))
+        hit = check_summaries(_summary_engine(args.engine), args.path, rows, args.workers)
+        if hit is None and rows is not None:
+            print(f"{args.engine}: all {len(rows) * N_KEYS:,} sampled cells "
+                  f"({len(rows)} rows, seed {args.seed}) match the golden corpus.")
+            return 0
+    if hit is None:
+        print(f"{args.engine}: all {N_KEYS * N_KEYS:,} cells match the golden corpus.")
+        return 0
+    print(f"{args.engine}: first divergence at groom {hit['groom']} × bride {hit['bride']} "
+          f"(keys {hit['groom_key']}, {hit['bride_key']}): {', '.join(hit['fields'])}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
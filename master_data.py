@@ -3,6 +3,8 @@ Master Data for Tamil Astro Matching Calculator
 All data is structured for easy extension and maintenance.
 """
 
+import hashlib
+
 # ─────────────────────────────────────────────────────────────
 # 27 Nakshatras with Rasi, Lord, Deity, Gana, Nadi, Yoni, Varna
 # Each star has 4 Padhams (quarters)
@@ -276,6 +278,14 @@ PORUTHAMS = [
 # Total max raw score
 TOTAL_MAX_SCORE = sum(p["max_score"] for p in PORUTHAMS)  # = 41
 
+# Named weight profiles — one weight per porutham, in PORUTHAMS order.
+# "default" is the weight column above and gives calculate_all()'s final_percentage.
+WEIGHT_PROFILES = {
+    "default":      tuple(p["weight"] for p in PORUTHAMS),
+    "equal":        (1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0),
+    "dosha_strict": (1.0, 1.5, 0.8, 1.0, 1.2, 1.3, 3.0, 1.0, 0.5, 3.5),   # Rajju and Nadi dominate
+}
+
 # ─────────────────────────────────────────────────────────────
 # PADHAM (Quarter) DATA — Each Nakshatra has 4 Padhams
 # Each Padham spans 3°20' = 200 arc-minutes
@@ -291,20 +301,154 @@ def get_padham_navamsa(star_id: int, padham: int) -> str:
     idx = ((star_id - 1) * 4 + (padham - 1)) % 12
     return PADHAM_NAVAMSA[idx]
 
+# ─────────────────────────────────────────────────────────────
+# ALIASES — common alternate spellings (matched case-insensitively)
+# ─────────────────────────────────────────────────────────────
+
+STAR_ALIASES = {
+    1:  ["Aswini", "Asvini", "Ashvini"],
+    2:  ["Bharini"],
+    3:  ["Kritika", "Karthigai", "Karthika", "Kruthika"],
+    4:  ["Rohani"],
+    5:  ["Mrigasira", "Mrigashirsha", "Mirugasirisham", "Mrigasheersham"],
+    6:  ["Arudra", "Aardra", "Thiruvathirai", "Thiruvadhirai"],
+    7:  ["Punarpoosam", "Punarpusam"],
+    8:  ["Poosam", "Pushyami", "Pusya"],
+    9:  ["Ayilyam", "Aslesha", "Ashlesa"],
+    10: ["Makam", "Magam", "Makha"],
+    11: ["Pooram", "Purva Phalguni", "Purvaphalguni", "Pubba"],
+    12: ["Uthiram", "Uttaraphalguni"],
+    13: ["Hastham", "Atham", "Hastam"],
+    14: ["Chithirai", "Chithra", "Chitta"],
+    15: ["Swathi", "Svati", "Chothi"],
+    16: ["Visakam", "Vishaka", "Visakha"],
+    17: ["Anusham", "Anizham"],
+    18: ["Kettai", "Jyestha", "Jyeshta", "Triketta"],
+    19: ["Moolam", "Moola"],
+    20: ["Pooradam", "Purvashada", "Purvashadha"],
+    21: ["Uthiradam", "Uttarashada", "Uttarashadha"],
+    22: ["Thiruvonam", "Sravana", "Shravan", "Onam"],
+    23: ["Avittam", "Dhanishtha", "Shravishtha"],
+    24: ["Sadayam", "Sathayam", "Shatabhishak", "Satabhisha"],
+    25: ["Poorattathi", "Purva Bhadrapada", "Purvabhadra"],
+    26: ["Uthirattathi", "Uttara Bhadrapada", "Uttarabhadra"],
+    27: ["Revathi"],
+}
+
+RASI_ALIASES = {
+    1:  ["Mesham"],
+    2:  ["Rishabam", "Rishabham", "Vrishabham", "Vrishabh"],
+    3:  ["Mithunam"],
+    4:  ["Kadagam", "Karka", "Karkata", "Karkatakam"],
+    5:  ["Simmam", "Simham"],
+    6:  ["Kanni"],
+    7:  ["Thulam", "Thula", "Tulam"],
+    8:  ["Viruchigam", "Vrishchika", "Vrischikam"],
+    9:  ["Dhanusu", "Dhanush", "Dhanu"],
+    10: ["Magaram", "Makaram"],
+    11: ["Kumbam", "Kumbham"],
+    12: ["Meenam", "Mina"],
+}
+
+# ─────────────────────────────────────────────────────────────
+# COMPILED CATALOG — built once at import
+# Integer codes in parallel arrays indexed by (id - 1), O(1) name
+# lookups, and set / 2-D forms of the pair tables for the engine
+# ─────────────────────────────────────────────────────────────
+
+def _codes(values) -> tuple:
+    """Distinct values in first-seen order."""
+    return tuple(dict.fromkeys(values))
+
+GANAS  = _codes(g for pair in GANA_TABLE for g in pair)
+NADIS  = _codes(n for pair in NADI_TABLE for n in pair)
+YONIS  = _codes([n["yoni"] for n in NAKSHATRAS]
+                + [y for kind in ("friendly", "enemy") for pair in YONI_TABLE[kind] for y in pair])
+VARNAS = tuple(VARNA_RANK)
+RAJJUS = tuple(RAJJU_GROUPS)
+PLANETS = _codes([n["lord"] for n in NAKSHATRAS] + [r["lord"] for r in RASIS]
+                 + list(PLANET_FRIENDS) + list(PLANET_ENEMIES))
+
+_PLANET_CODE = {p: i for i, p in enumerate(PLANETS)}
+
+# Star attributes — struct of arrays, index star_id - 1
+STAR_GANA  = tuple(GANAS.index(n["gana"]) for n in NAKSHATRAS)
+STAR_NADI  = tuple(NADIS.index(n["nadi"]) for n in NAKSHATRAS)
+STAR_YONI  = tuple(YONIS.index(n["yoni"]) for n in NAKSHATRAS)
+STAR_VARNA = tuple(VARNAS.index(n["varna"]) for n in NAKSHATRAS)
+STAR_RAJJU_CODE = tuple(RAJJUS.index(STAR_RAJJU[n["id"]]) for n in NAKSHATRAS)
+VARNA_RANKS = tuple(VARNA_RANK[v] for v in VARNAS)
+
+# Rasi attributes, index rasi_id - 1
+RASI_LORD = tuple(_PLANET_CODE[r["lord"]] for r in RASIS)
+
+# Pair tables, indexed [groom code][bride code]; None where the table has no entry
+GANA_MATRIX = tuple(tuple(GANA_TABLE.get((g, b)) for b in GANAS) for g in GANAS)
+NADI_MATRIX = tuple(tuple(NADI_TABLE.get((g, b)) for b in NADIS) for g in NADIS)
+YONI_FRIENDLY = frozenset(YONI_TABLE["friendly"])
+YONI_ENEMY    = frozenset(YONI_TABLE["enemy"])
+YONI_FRIENDLY_MATRIX = tuple(tuple((g, b) in YONI_FRIENDLY for b in YONIS) for g in YONIS)
+YONI_ENEMY_MATRIX    = tuple(tuple((g, b) in YONI_ENEMY for b in YONIS) for g in YONIS)
+VEDHA_SET     = frozenset(VEDHA_PAIRS)
+VEDHA_MATRIX  = tuple(tuple((g["id"], b["id"]) in VEDHA_SET for b in NAKSHATRAS)
+                      for g in NAKSHATRAS)
+PLANET_FRIEND_MATRIX = tuple(tuple(q in PLANET_FRIENDS.get(p, []) for q in PLANETS)
+                             for p in PLANETS)
+PLANET_ENEMY_MATRIX  = tuple(tuple(q in PLANET_ENEMIES.get(p, []) for q in PLANETS)
+                             for p in PLANETS)
+
+def _normalize(name: str) -> str:
+    return " ".join(str(name).replace("-", " ").split()).casefold()
+
+def _name_index(rows: list, aliases: dict) -> dict:
+    """casefolded English name, Tamil name, UI label and aliases → row."""
+    index = {}
+    for row in rows:
+        keys = [row["name"], row["tamil"], f"{row['name']} ({row['tamil']})"]
+        keys += [row["english"]] if "english" in row else []
+        for key in keys + aliases.get(row["id"], []):
+            index.setdefault(_normalize(key), row)
+    return index
+
+_STAR_EXACT = {n["name"]: n for n in NAKSHATRAS}
+_RASI_EXACT = {r["name"]: r for r in RASIS}
+_STAR_INDEX = _name_index(NAKSHATRAS, STAR_ALIASES)
+_RASI_INDEX = _name_index(RASIS, RASI_ALIASES)
+
+def get_nakshatra_by_id(star_id: int) -> dict:
+    return NAKSHATRAS[star_id - 1] if 1 <= star_id <= len(NAKSHATRAS) else None
+
+def get_rasi_by_id(rasi_id: int) -> dict:
+    return RASIS[rasi_id - 1] if 1 <= rasi_id <= len(RASIS) else None
+
 def get_nakshatra_by_name(name: str) -> dict:
-    for n in NAKSHATRAS:
-        if n["name"] == name:
-            return n
-    return None
+    """O(1) by English name, Tamil name, "Name (Tamil)" label or alias; None if unknown."""
+    return _STAR_EXACT.get(name) or _STAR_INDEX.get(_normalize(name))
 
 def get_rasi_by_name(name: str) -> dict:
-    for r in RASIS:
-        if r["name"] == name:
-            return r
-    return None
+    """O(1) by English name, Tamil name, western sign or alias; None if unknown."""
+    return _RASI_EXACT.get(name) or _RASI_INDEX.get(_normalize(name))
 
 def get_nakshatra_names() -> list:
     return [f"{n['name']} ({n['tamil']})" for n in NAKSHATRAS]
 
 def get_rasi_names() -> list:
     return [f"{r['name']} ({r['tamil']})" for r in RASIS]
+
+
+# ─────────────────────────────────────────────────────────────
+# DATA VERSION
+# Fingerprint of every table above; precomputed artefacts (cube,
+# corpus, percentile tables) carry it and refuse to load on mismatch
+# ─────────────────────────────────────────────────────────────
+
+def _data_fingerprint() -> str:
+    tables = (
+        NAKSHATRAS, RASIS, RASI_COMPATIBILITY, DINA_COMPATIBILITY,
+        GANA_TABLE, NADI_TABLE, YONI_TABLE, RAJJU_GROUPS, RAJJU_SCORES,
+        VARNA_RANK, sorted(MAHENDRA_GOOD), STREE_DEERGA_THRESHOLD, VEDHA_PAIRS,
+        PLANET_FRIENDS, PLANET_ENEMIES, PORUTHAMS, PADHAM_NAVAMSA,
+    )
+    return hashlib.sha256(repr(tables).encode("utf-8")).hexdigest()[:16]
+
+MASTER_DATA_VERSION = _data_fingerprint()
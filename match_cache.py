@@ -0,0 +1,99 @@
+"""
+match_cache.py — Process-wide LRU memo for calculate_all()
+A summary depends only on ((g_star, g_padham, g_rasi), (b_star, b_padham, b_rasi)),
+so identical star combinations from any session are served from memory with
+the caller's own groom/bride dicts (names) patched in.
+"""
+
+import threading
+from collections import OrderedDict
+
+from master_data import get_nakshatra_by_name, get_rasi_by_name
+from score_tables import CompiledMatchingEngine, N_PADHAMS
+
+
+DEFAULT_MAXSIZE = 4096
+
+
+def profile_tuple(person: dict) -> tuple:
+    """Normalized (star_id, padham, rasi_id) for a groom/bride dict; padham may be "2" or 2."""
+    star = get_nakshatra_by_name(person["star_name"])
+    rasi = get_rasi_by_name(person["rasi_name"])
+    if star is None or rasi is None:
+        raise ValueError(f"Unknown star or rasi: {person['star_name']!r} / {person['rasi_name']!r}")
+    try:
+        padham = int(person.get("padham", 1))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid padham {person.get('padham')!r}") from None
+    if not 1 <= padham <= N_PADHAMS:
+        raise ValueError(f"Invalid padham {padham!r}")
+    return (star["id"], padham, rasi["id"])
+
+
+class MatchCache:
+    """Bounded, thread-safe LRU of summaries keyed by normalized profile tuples."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def calculate_all(self, groom: dict, bride: dict, with_details: bool = True) -> dict:
+        """
+        Same result as AstroMatchingEngine(groom, bride).calculate_all().
+        Nested values are shared between callers — treat the summary as read-only.
+        """
+        key = (profile_tuple(groom), profile_tuple(bride), with_details)
+        with self._lock:
+            summary = self._data.get(key)
+            if summary is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if summary is None:
+            summary = CompiledMatchingEngine(dict(groom, padham=key[0][1]),
+                                             dict(bride, padham=key[1][1])).calculate_all(with_details)
+            with self._lock:
+                self.misses += 1
+                self._data[key] = summary
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        return dict(summary, groom=groom, bride=bride)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# ─────────────────────────────────────────────────────────────
+# PROCESS-WIDE DEFAULT
+# ─────────────────────────────────────────────────────────────
+
+_default_cache = MatchCache()
+
+
+def cached_calculate_all(groom: dict, bride: dict, with_details: bool = True) -> dict:
+    return _default_cache.calculate_all(groom, bride, with_details)
+
+
+def cache_info() -> dict:
+    return _default_cache.info()
+
+
+def cache_clear() -> None:
+    _default_cache.clear()
@@ -0,0 +1,330 @@
+"""
+match_server.py — Headless HTTP scoring service (stdlib asyncio)
+
+    POST /match        {"groom": {...}, "bride": {...}, "fields": "...", "with_details": true}
+    POST /match/batch  {"pairs": [{"groom": {...}, "bride": {...}}, ...], "fields": "..."}
+    GET  /health
+
+People use the engine's own keys (name / star_name / padham / rasi_name) or the
+flat groom_star / bride_rasi ... keys of batch_score.py.
+
+Concurrent /match requests arriving within --window-ms are coalesced into one
+batch. Requests whose fields are all scores-level (SCORE_FIELDS) are scored
+with one vectorized score_pairwise() call; the rest of the batch, full
+summaries included, is scored with one score_pairs() call per with_details
+setting through the match cache. /match/batch is one such call, and large
+batches are scored on a worker thread so the event loop keeps serving.
+
+Run:  python match_server.py --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import traceback
+
+from master_data import TOTAL_MAX_SCORE
+from matching_engine import VERDICTS
+from score_tables import MAX_WEIGHTED
+from batch_engine import score_pairwise, dosha_names, CRITICAL_MASK
+from percentiles import percentile, raw_percentile
+from batch_score import parse_people, parse_fields, needs_details, project
+from match_cache import MatchCache, profile_tuple
+
+
+DEFAULT_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 256
+MAX_BATCH_PAIRS = 10_000
+MAX_BODY_BYTES = 8 * 1024 * 1024
+EXECUTOR_MIN_PAIRS = 64   # /match/batch requests at least this big are scored off the event loop
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ─────────────────────────────────────────────────────────────
+# SCORING
+# ─────────────────────────────────────────────────────────────
+
+_cache = MatchCache(maxsize=65536)
+
+
+def score_pairs(pairs: list, fields=None, with_details: bool = True) -> list:
+    """Summaries (projected to fields) for a list of (groom, bride) through the match cache."""
+    return [project(_cache.calculate_all(groom, bride, with_details), fields)
+            for groom, bride in pairs]
+
+
+# Summary keys score_pairs_vectorized() produces (groom / bride are the caller's dicts)
+SCORE_FIELDS = frozenset((
+    "groom", "bride", "raw_score", "raw_max", "raw_percentage", "raw_percentile",
+    "weighted_score", "max_weighted", "final_percentage", "percentile",
+    "verdict", "verdict_color", "critical_doshas", "minor_doshas", "total_doshas",
+))
+_RAW_PCT = [round((raw / TOTAL_MAX_SCORE) * 100, 1) for raw in range(TOTAL_MAX_SCORE + 1)]
+
+
+def vectorizable(fields) -> bool:
+    """Whether every requested field is a scores-level summary field."""
+    return fields is not None and all(path[0] in SCORE_FIELDS for path in fields)
+
+
+def score_pairs_vectorized(pairs: list, fields=None) -> list:
+    """
+    score_pairs() for SCORE_FIELDS projections — one score_pairwise() call for
+    all pairs. fields=None gives every SCORE_FIELDS key.
+    """
+    if not pairs:
+        return []
+    m = score_pairwise([profile_tuple(g) for g, _ in pairs], [profile_tuple(b) for _, b in pairs])
+    out = []
+    for (groom, bride), raw, weighted, pct, code, mask in zip(
+            pairs, m["raw_score"].tolist(), m["weighted_score"].tolist(),
+            m["final_percentage"].tolist(), m["verdict_code"].tolist(), m["dosha_mask"].tolist()):
+        verdict, verdict_color = VERDICTS[code]
+        critical = dosha_names(mask & CRITICAL_MASK)
+        minor = dosha_names(mask & ~CRITICAL_MASK)
+        out.append(project({
+            "groom": groom,
+            "bride": bride,
+            "raw_score": raw,
+            "raw_max": TOTAL_MAX_SCORE,
+            "raw_percentage": _RAW_PCT[raw],
+            "raw_percentile": raw_percentile(raw),
+            "weighted_score": weighted,
+            "max_weighted": round(MAX_WEIGHTED, 2),
+            "final_percentage": pct,
+            "percentile": percentile(pct),
+            "verdict": verdict,
+            "verdict_color": verdict_color,
+            "critical_doshas": critical,
+            "minor_doshas": minor,
+            "total_doshas": len(critical) + len(minor),
+        }, fields))
+    return out
+
+
+class MicroBatcher:
+    """
+    Coalesces single-pair /match requests. The first request of a batch arms a
+    window-long timer; the batch is scored when the timer fires or max_batch
+    requests are waiting, whichever comes first — scores-level requests with
+    one vectorized call, the others with one score_pairs() call per
+    with_details setting.
+    """
+
+    def __init__(self, window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending = []   # (groom, bride, fields, with_details, future)
+        self._timer = None
+        self.batches = self.requests = 0
+
+    def submit(self, groom: dict, bride: dict, fields, with_details: bool = True) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((groom, bride, fields, with_details, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return future
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        groups = {}   # None → scores-level requests, else with_details → full-summary requests
+        for item in batch:
+            key = None if vectorizable(item[2]) else item[3]
+            groups.setdefault(key, []).append(item)
+        for key, items in groups.items():
+            pairs = [(g, b) for g, b, *_ in items]
+            try:
+                if key is None:
+                    summaries = score_pairs_vectorized(pairs)
+                else:
+                    summaries = score_pairs(pairs, None, key)
+            except Exception as e:
+                for *_, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, fields, _, future), summary in zip(items, summaries):
+                if not future.done():
+                    future.set_result(project(summary, fields))
+
+
+# ─────────────────────────────────────────────────────────────
+# HANDLERS
+# ─────────────────────────────────────────────────────────────
+
+def _parse_person_pair(row, index: int = 1) -> tuple:
+    if not isinstance(row, dict):
+        raise HTTPError(400, f"pair {index}: expected a JSON object")
+    try:
+        return parse_people(row)
+    except ValueError as e:
+        raise HTTPError(400, f"pair {index}: {e}") from None
+
+
+def _options(body: dict) -> tuple:
+    fields = body.get("fields")
+    if isinstance(fields, list) and all(isinstance(f, str) for f in fields):
+        fields = ",".join(fields)
+    elif fields is not None and not isinstance(fields, str):
+        raise HTTPError(400, "fields must be a string or a list of strings")
+    fields = parse_fields(fields)
+    with_details = body.get("with_details", needs_details(fields))
+    if not isinstance(with_details, bool):
+        raise HTTPError(400, "with_details must be true or false")
+    return fields, with_details
+
+
+async def handle_match(body: dict, batcher: MicroBatcher) -> dict:
+    groom, bride = _parse_person_pair(body)
+    fields, with_details = _options(body)
+    return await batcher.submit(groom, bride, fields, with_details)
+
+
+async def handle_batch(body) -> dict:
+    pairs = body.get("pairs") if isinstance(body, dict) else body
+    if not isinstance(pairs, list):
+        raise HTTPError(400, "expected {\"pairs\": [...]}")
+    if len(pairs) > MAX_BATCH_PAIRS:
+        raise HTTPError(413, f"at most {MAX_BATCH_PAIRS} pairs per batch")
+    parsed = [_parse_person_pair(row, i) for i, row in enumerate(pairs, 1)]
+    fields, with_details = _options(body if isinstance(body, dict) else {})
+    if vectorizable(fields):
+        job = (score_pairs_vectorized, parsed, fields)
+    else:
+        job = (score_pairs, parsed, fields, with_details)
+    if len(parsed) < EXECUTOR_MIN_PAIRS:
+        return {"results": job[0](*job[1:])}
+    return {"results": await asyncio.get_running_loop().run_in_executor(None, *job)}
+
+
+# ─────────────────────────────────────────────────────────────
+# HTTP/1.1 (keep-alive, Content-Length bodies)
+# ─────────────────────────────────────────────────────────────
+
+async def _read_request(reader: asyncio.StreamReader):
+    """(method, path, keep_alive, body) or None when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "bad Content-Length") from None
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method, target.split("?", 1)[0], keep_alive, body
+
+
+def _response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def _dispatch(method: str, path: str, body: bytes, batcher: MicroBatcher):
+    if path == "/health":
+        return {"status": "ok", "batches": batcher.batches, "requests": batcher.requests}
+    if path not in ("/match", "/match/batch"):
+        raise HTTPError(404, f"no route for {path}")
+    if method != "POST":
+        raise HTTPError(405, f"{path} accepts POST")
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(400, "body is not valid JSON") from None
+    if path == "/match":
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "expected a JSON object")
+        return await handle_match(payload, batcher)
+    return await handle_batch(payload)
+
+
+async def _serve_connection(reader, writer, batcher: MicroBatcher) -> None:
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, keep_alive, body = request
+                status, payload = 200, await _dispatch(method, path, body, batcher)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except asyncio.IncompleteReadError:
+                break
+            except Exception:
+                traceback.print_exc()
+                status, payload = 500, {"error": "internal server error"}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080,
+                window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH):
+    batcher = MicroBatcher(window_ms, max_batch)
+    server = await asyncio.start_server(
+        lambda r, w: _serve_connection(r, w, batcher), host, port, backlog=1024)
+    print(f"Astro match service on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Headless Porutham scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS,
+                        help=f"Coalescing window for /match (default {DEFAULT_WINDOW_MS} ms)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help=f"Flush a batch early at this many requests (default {DEFAULT_MAX_BATCH})")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.window_ms, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
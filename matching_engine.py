@@ -3,53 +3,240 @@ Astro Matching Engine — Core Calculation Logic
 Implements all 10 Poruthams with full accuracy.
 """
 
+from time import perf_counter_ns
+
 from master_data import (
     NAKSHATRAS, RASIS, PORUTHAMS,
-    GANA_TABLE, NADI_TABLE, YONI_TABLE,
-    RAJJU_SCORES, STAR_RAJJU,
-    VARNA_RANK, MAHENDRA_GOOD, STREE_DEERGA_THRESHOLD,
-    VEDHA_PAIRS, PLANET_FRIENDS, PLANET_ENEMIES,
+    RAJJU_SCORES, RAJJUS, MAHENDRA_GOOD, STREE_DEERGA_THRESHOLD,
     RASI_COMPATIBILITY, DINA_COMPATIBILITY,
+    STAR_GANA, STAR_NADI, STAR_YONI, STAR_VARNA, STAR_RAJJU_CODE, VARNA_RANKS,
+    GANA_MATRIX, NADI_MATRIX, YONI_FRIENDLY_MATRIX, YONI_ENEMY_MATRIX, VEDHA_MATRIX,
+    PLANET_FRIEND_MATRIX, PLANET_ENEMY_MATRIX, RASI_LORD,
     get_nakshatra_by_name, get_rasi_by_name,
-    get_padham_navamsa, TOTAL_MAX_SCORE
+    get_padham_navamsa,
 )
+from percentiles import percentile, raw_percentile
+
+# Bump whenever a calc_* rule or the summary shape changes so precomputed artefacts are rebuilt
+ENGINE_VERSION = 2
 
 
 class MatchResult:
-    """Holds result for a single Porutham."""
-    def __init__(self, name: str, tamil: str, score: int, max_score: int,
-                 compatibility: str, details: str, is_critical: bool,
-                 category: str, dosha: bool = False):
+    """
+    Holds result for a single Porutham.
+    Immutable and interned: identical results are one shared instance, and
+    to_dict() is built once per instance — treat the returned dict as read-only.
+    """
+    __slots__ = ("name", "tamil", "score", "max_score", "compatibility", "details",
+                 "is_critical", "category", "dosha", "percentage", "_dict")
+
+    # field tuple → instance; bounded by the finite set of results master_data can produce
+    _interned: dict = {}
+
+    def __new__(cls, name: str, tamil: str, score: int, max_score: int,
+                compatibility: str, details: str, is_critical: bool,
+                category: str, dosha: bool = False):
+        key = (name, tamil, score, max_score, compatibility, details, is_critical, category, dosha)
+        self = cls._interned.get(key)
+        if self is not None:
+            return self
+        self = object.__new__(cls)
+        init = object.__setattr__
+        init(self, "name", name)
+        init(self, "tamil", tamil)
+        init(self, "score", score)
+        init(self, "max_score", max_score)
+        init(self, "compatibility", compatibility)
+        init(self, "details", details)
+        init(self, "is_critical", is_critical)
+        init(self, "category", category)
+        init(self, "dosha", dosha)
+        init(self, "percentage", round((score / max_score) * 100, 1) if max_score else 0)
+        init(self, "_dict", None)
+        return cls._interned.setdefault(key, self)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("MatchResult is immutable")
+
+    def __delattr__(self, attr):
+        raise AttributeError("MatchResult is immutable")
+
+    def __reduce__(self):
+        return (MatchResult, (self.name, self.tamil, self.score, self.max_score,
+                              self.compatibility, self.details, self.is_critical,
+                              self.category, self.dosha))
+
+    def __repr__(self):
+        return f"MatchResult({self.name!r}, score={self.score}/{self.max_score}, dosha={self.dosha})"
+
+    def to_dict(self):
+        d = self._dict
+        if d is None:
+            d = {
+                "name": self.name,
+                "tamil": self.tamil,
+                "score": self.score,
+                "max_score": self.max_score,
+                "percentage": self.percentage,
+                "compatibility": self.compatibility,
+                "details": self.details,
+                "is_critical": self.is_critical,
+                "category": self.category,
+                "dosha": self.dosha,
+            }
+            object.__setattr__(self, "_dict", d)
+        return d
+
+
+# ─────────────────────────────────────────────────────────────
+# VERDICT TIERS
+# A verdict code is an index into VERDICTS; shared by every engine
+# ─────────────────────────────────────────────────────────────
+
+SEVERE_DOSHAS = ("Rajju Porutham", "Nadi Porutham")
+
+VERDICTS = [
+    ("Excellent Match ✨", "green"),
+    ("Good Match 👍", "blue"),
+    ("Average Match — Consult Astrologer 🔍", "orange"),
+    ("Poor Match ⚠️", "red"),
+] + [(f"⚠️ Critical Dosha: {name} — Strongly Caution", "red") for name in SEVERE_DOSHAS]
+
+
+def verdict_code(final_percentage: float, n_critical: int, severe: str = None) -> int:
+    """
+    Verdict code for a match.
+    severe = name of the first zero-score Nadi/Rajju critical dosha, if any.
+    """
+    if severe is not None:
+        return 4 + SEVERE_DOSHAS.index(severe)
+    if final_percentage >= 80 and not n_critical:
+        return 0
+    if final_percentage >= 65 and n_critical <= 1:
+        return 1
+    if final_percentage >= 50:
+        return 2
+    return 3
+
+
+# ─────────────────────────────────────────────────────────────
+# PORUTHAM REGISTRY
+# Each rule is registered once with its weight, max score, what it depends
+# on and, once score_tables compiles it, its lookup tables; calculate_all()
+# runs the registry in registration order.
+# ─────────────────────────────────────────────────────────────
+
+class PoruthamRule:
+    """
+    A registered porutham.
+    fn(engine) -> MatchResult evaluates the rule. depends is "star" (only the two
+    nakshatras), "rasi" (only the two rasis) or None (needs the full engine).
+    lookup is the rule's compiled (detailed, brief) result tables, indexed
+    [groom id - 1][bride id - 1]; score_tables builds it for star / rasi rules
+    on first use. calls / total_ns are filled in while rule profiling is enabled.
+    """
+    __slots__ = ("name", "fn", "weight", "max_score", "depends", "lookup", "calls", "total_ns")
+
+    def __init__(self, name: str, fn, weight: float, max_score: int, depends: str = None):
         self.name = name
-        self.tamil = tamil
-        self.score = score
+        self.fn = fn
+        self.weight = weight
         self.max_score = max_score
-        self.compatibility = compatibility
-        self.details = details
-        self.is_critical = is_critical
-        self.category = category
-        self.dosha = dosha
-        self.percentage = round((score / max_score) * 100, 1) if max_score else 0
+        self.depends = depends
+        self.lookup = None
+        self.calls = 0
+        self.total_ns = 0
 
-    def to_dict(self):
-        return {
-            "name": self.name,
-            "tamil": self.tamil,
-            "score": self.score,
-            "max_score": self.max_score,
-            "percentage": self.percentage,
-            "compatibility": self.compatibility,
-            "details": self.details,
-            "is_critical": self.is_critical,
-            "category": self.category,
-            "dosha": self.dosha,
-        }
+    def __repr__(self):
+        return f"PoruthamRule({self.name!r}, weight={self.weight}, max_score={self.max_score})"
+
+
+PORUTHAM_REGISTRY: list[PoruthamRule] = []
+_registry_totals = {"raw_max": 0, "max_weighted": 0}
+_profiling = False
+# Engines that don't evaluate rules one by one (CompiledMatchingEngine) time
+# their stages instead: stage name → [calls, total_ns]
+STAGE_PROFILE: dict[str, list] = {}
+
+
+def register_porutham(name: str, weight: float = None, max_score: int = None,
+                      depends: str = None):
+    """
+    Decorator registering fn(engine) -> MatchResult as a porutham.
+    weight / max_score default to the PORUTHAMS entry of the same name, so
+    regional poruthams just pass them explicitly.
+    """
+    spec = next((p for p in PORUTHAMS if p["name"] == name), {})
+    weight = spec.get("weight") if weight is None else weight
+    max_score = spec.get("max_score") if max_score is None else max_score
+    if weight is None or max_score is None:
+        raise ValueError(f"'{name}' is not in PORUTHAMS — pass weight and max_score.")
+    if depends not in (None, "star", "rasi"):
+        raise ValueError("depends must be 'star', 'rasi' or None.")
+    if any(rule.name == name for rule in PORUTHAM_REGISTRY):
+        raise ValueError(f"Porutham '{name}' is already registered.")
+
+    def decorator(fn):
+        PORUTHAM_REGISTRY.append(PoruthamRule(name, fn, weight, max_score, depends))
+        _registry_totals["raw_max"] = sum(r.max_score for r in PORUTHAM_REGISTRY)
+        _registry_totals["max_weighted"] = sum(r.max_score * r.weight for r in PORUTHAM_REGISTRY)
+        return fn
+    return decorator
+
+
+def enable_rule_profiling(enabled: bool = True) -> None:
+    """Record per-rule (and per-stage) call counts and cumulative nanoseconds in calculate_all()."""
+    global _profiling
+    _profiling = enabled
+
+
+def rule_profiling_enabled() -> bool:
+    return _profiling
+
+
+def reset_rule_profile() -> None:
+    for rule in PORUTHAM_REGISTRY:
+        rule.calls = rule.total_ns = 0
+    STAGE_PROFILE.clear()
+
+
+def record_stage(name: str, elapsed_ns: int) -> None:
+    totals = STAGE_PROFILE.setdefault(name, [0, 0])
+    totals[0] += 1
+    totals[1] += elapsed_ns
+
+
+def rule_profile() -> list:
+    """Per-rule and per-stage timings, most expensive first; "kind" is "rule" or "stage"."""
+    rows = [{
+        "name": rule.name,
+        "kind": "rule",
+        "calls": rule.calls,
+        "total_ns": rule.total_ns,
+        "mean_ns": rule.total_ns / rule.calls if rule.calls else 0,
+    } for rule in PORUTHAM_REGISTRY]
+    rows += [{
+        "name": name,
+        "kind": "stage",
+        "calls": calls,
+        "total_ns": total_ns,
+        "mean_ns": total_ns / calls if calls else 0,
+    } for name, (calls, total_ns) in STAGE_PROFILE.items()]
+    return sorted(rows, key=lambda r: r["total_ns"], reverse=True)
+
+
+def _run_profiled(rule: PoruthamRule, engine) -> "MatchResult":
+    start = perf_counter_ns()
+    result = rule.fn(engine)
+    rule.total_ns += perf_counter_ns() - start
+    rule.calls += 1
+    return result
 
 
 class AstroMatchingEngine:
     """
     Main engine for computing all 10 Poruthams.
-    Easily extensible — add new methods and register in calculate_all().
+    Easily extensible — decorate a new rule with @register_porutham.
     """
 
     def __init__(self, groom: dict, bride: dict):
@@ -69,10 +256,13 @@ class AstroMatchingEngine:
         self.bride_rasi = get_rasi_by_name(bride["rasi_name"])
         self.results: list[MatchResult] = []
         self.summary = {}
+        # Scores-only mode skips formatting the per-porutham details text
+        self.with_details = True
 
     # ──────────────────────────────────────────────
     # 1. DINA PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Dina Porutham", depends="star")
     def calc_dina(self) -> MatchResult:
         g_id = self.groom_star["id"]
         b_id = self.bride_star["id"]
@@ -87,26 +277,31 @@ class AstroMatchingEngine:
             score = 0; compat = "Poor"
         details = (f"Star count from Bride ({self.bride_star['name']}) to "
                    f"Groom ({self.groom_star['name']}) = {count}. "
-                   f"Remainder (÷9) = {remainder}.")
+                   f"Remainder (÷9) = {remainder}."
+                   if self.with_details else "")
         return MatchResult("Dina Porutham", "தின பொருத்தம்", score, 3, compat, details, False, "Health")
 
     # ──────────────────────────────────────────────
     # 2. GANA PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Gana Porutham", depends="star")
     def calc_gana(self) -> MatchResult:
         g_gana = self.groom_star["gana"]
         b_gana = self.bride_star["gana"]
-        result = GANA_TABLE.get((g_gana, b_gana), {"score": 0, "compatibility": "Unknown"})
+        result = (GANA_MATRIX[STAR_GANA[self.groom_star["id"] - 1]][STAR_GANA[self.bride_star["id"] - 1]]
+                  or {"score": 0, "compatibility": "Unknown"})
         score = result["score"]
         compat = result["compatibility"]
         dosha = score < 3
         details = (f"Groom Gana: {g_gana} | Bride Gana: {b_gana}. "
-                   f"{'⚠️ Gana Dosha present!' if dosha else 'Compatible Ganas.'}")
+                   f"{'⚠️ Gana Dosha present!' if dosha else 'Compatible Ganas.'}"
+                   if self.with_details else "")
         return MatchResult("Gana Porutham", "கண பொருத்தம்", score, 6, compat, details, True, "Temperament", dosha)
 
     # ──────────────────────────────────────────────
     # 3. MAHENDRA PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Mahendra Porutham", depends="star")
     def calc_mahendra(self) -> MatchResult:
         g_id = self.groom_star["id"]
         b_id = self.bride_star["id"]
@@ -116,12 +311,14 @@ class AstroMatchingEngine:
         compat = "Excellent — Prosperity & Children" if good else "No Mahendra — Financial Caution"
         details = (f"Count from Bride to Groom = {count}. "
                    f"Mahendra stars: multiples of 4,7,10... "
-                   f"{'✅ Mahendra present!' if good else '❌ Not a Mahendra star count.'}")
+                   f"{'✅ Mahendra present!' if good else '❌ Not a Mahendra star count.'}"
+                   if self.with_details else "")
         return MatchResult("Mahendra Porutham", "மகேந்திர பொருத்தம்", score, 2, compat, details, False, "Prosperity")
 
     # ──────────────────────────────────────────────
     # 4. STREE DEERGA PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Stree Deerga", depends="star")
     def calc_stree_deerga(self) -> MatchResult:
         g_id = self.groom_star["id"]
         b_id = self.bride_star["id"]
@@ -135,30 +332,35 @@ class AstroMatchingEngine:
         dosha = score == 0
         details = (f"Count from Bride star to Groom star = {count}. "
                    f"Required: > {STREE_DEERGA_THRESHOLD}. "
-                   f"{'✅ Compatible' if not dosha else '⚠️ Dosha — Short count affects wife longevity'}.")
+                   f"{'✅ Compatible' if not dosha else '⚠️ Dosha — Short count affects wife longevity'}."
+                   if self.with_details else "")
         return MatchResult("Stree Deerga", "ஸ்திரீ தீர்க்கம்", score, 3, compat, details, False, "Wife Longevity", dosha)
 
     # ──────────────────────────────────────────────
     # 5. YONI PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Yoni Porutham", depends="star")
     def calc_yoni(self) -> MatchResult:
         g_yoni = self.groom_star["yoni"]
         b_yoni = self.bride_star["yoni"]
-        pair = (g_yoni, b_yoni)
-        if pair in YONI_TABLE["friendly"]:
+        g_code = STAR_YONI[self.groom_star["id"] - 1]
+        b_code = STAR_YONI[self.bride_star["id"] - 1]
+        if YONI_FRIENDLY_MATRIX[g_code][b_code]:
             score = 4; compat = "Excellent — Same Yoni/Friendly"
-        elif pair in YONI_TABLE["enemy"]:
+        elif YONI_ENEMY_MATRIX[g_code][b_code]:
             score = 0; compat = "Very Poor — Enemy Yoni Dosha"
         else:
             score = 2; compat = "Neutral — Acceptable"
         dosha = score == 0
         details = (f"Groom Yoni: {g_yoni} | Bride Yoni: {b_yoni}. "
-                   f"{'⚠️ Enemy Yoni — physical incompatibility!' if dosha else 'Yoni compatible.'}")
+                   f"{'⚠️ Enemy Yoni — physical incompatibility!' if dosha else 'Yoni compatible.'}"
+                   if self.with_details else "")
         return MatchResult("Yoni Porutham", "யோனி பொருத்தம்", score, 4, compat, details, True, "Physical Harmony", dosha)
 
     # ──────────────────────────────────────────────
     # 6. RASI PORUTHAM (with Rasi Adhipathi)
     # ──────────────────────────────────────────────
+    @register_porutham("Rasi Porutham", depends="rasi")
     def calc_rasi(self) -> MatchResult:
         g_rasi_id = self.groom_rasi["id"]
         b_rasi_id = self.bride_rasi["id"]
@@ -167,10 +369,12 @@ class AstroMatchingEngine:
         # Planetary lord compatibility bonus
         g_lord = self.groom_rasi["lord"]
         b_lord = self.bride_rasi["lord"]
+        g_code = RASI_LORD[g_rasi_id - 1]
+        b_code = RASI_LORD[b_rasi_id - 1]
         lord_bonus = 0
-        if b_lord in PLANET_FRIENDS.get(g_lord, []):
+        if PLANET_FRIEND_MATRIX[g_code][b_code]:
             lord_bonus = 2; lord_compat = "Friendly lords"
-        elif b_lord in PLANET_ENEMIES.get(g_lord, []):
+        elif PLANET_ENEMY_MATRIX[g_code][b_code]:
             lord_bonus = -1; lord_compat = "Enemy lords"
         else:
             lord_bonus = 1; lord_compat = "Neutral lords"
@@ -192,18 +396,21 @@ class AstroMatchingEngine:
         details = (f"Groom Rasi: {self.groom_rasi['name']} (Lord: {g_lord}) | "
                    f"Bride Rasi: {self.bride_rasi['name']} (Lord: {b_lord}). "
                    f"Rasi compatibility: {['Incompatible','Compatible','Highly Compatible'][pair_score]}. "
-                   f"Lord compatibility: {lord_compat}. Final score: {final_score}/7.")
+                   f"Lord compatibility: {lord_compat}. Final score: {final_score}/7."
+                   if self.with_details else "")
         return MatchResult("Rasi Porutham", "ராசி பொருத்தம்", final_score, 7, compat, details, True, "Mental Harmony", dosha)
 
     # ──────────────────────────────────────────────
     # 7. RAJJU PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Rajju Porutham", depends="star")
     def calc_rajju(self) -> MatchResult:
         g_id = self.groom_star["id"]
         b_id = self.bride_star["id"]
-        g_rajju = STAR_RAJJU.get(g_id, "Unknown")
-        b_rajju = STAR_RAJJU.get(b_id, "Unknown")
-        if g_rajju != b_rajju:
+        g_code = STAR_RAJJU_CODE[g_id - 1]
+        b_code = STAR_RAJJU_CODE[b_id - 1]
+        g_rajju, b_rajju = RAJJUS[g_code], RAJJUS[b_code]
+        if g_code != b_code:
             result = RAJJU_SCORES["different"]
             dosha = False
         else:
@@ -212,51 +419,59 @@ class AstroMatchingEngine:
         score = result["score"]
         compat = result["compatibility"]
         details = (f"Groom Rajju: {g_rajju} | Bride Rajju: {b_rajju}. "
-                   f"{'⚠️ Same Rajju — Dosha! ' + compat if dosha else '✅ Different Rajju — No Dosha!'}")
+                   f"{'⚠️ Same Rajju — Dosha! ' + compat if dosha else '✅ Different Rajju — No Dosha!'}"
+                   if self.with_details else "")
         return MatchResult("Rajju Porutham", "ரஜ்ஜு பொருத்தம்", score, 5, compat, details, True, "Marital Bliss", dosha)
 
     # ──────────────────────────────────────────────
     # 8. VEDHA PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Vedha Porutham", depends="star")
     def calc_vedha(self) -> MatchResult:
         g_id = self.groom_star["id"]
         b_id = self.bride_star["id"]
-        has_vedha = (g_id, b_id) in VEDHA_PAIRS
+        has_vedha = VEDHA_MATRIX[g_id - 1][b_id - 1]
         score = 0 if has_vedha else 2
         compat = "⚠️ Vedha Dosha — Obstacle present!" if has_vedha else "✅ No Vedha Dosha"
         dosha = has_vedha
         details = (f"Groom Star: #{g_id} | Bride Star: #{b_id}. "
-                   f"{'These stars cause mutual affliction (Vedha)!' if has_vedha else 'No Vedha obstruction between these stars.'}")
+                   f"{'These stars cause mutual affliction (Vedha)!' if has_vedha else 'No Vedha obstruction between these stars.'}"
+                   if self.with_details else "")
         return MatchResult("Vedha Porutham", "வேத பொருத்தம்", score, 2, compat, details, False, "Obstacles", dosha)
 
     # ──────────────────────────────────────────────
     # 9. VARNA PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Varna Porutham", depends="star")
     def calc_varna(self) -> MatchResult:
         g_varna = self.groom_star["varna"]
         b_varna = self.bride_star["varna"]
-        g_rank = VARNA_RANK.get(g_varna, 0)
-        b_rank = VARNA_RANK.get(b_varna, 0)
+        g_rank = VARNA_RANKS[STAR_VARNA[self.groom_star["id"] - 1]]
+        b_rank = VARNA_RANKS[STAR_VARNA[self.bride_star["id"] - 1]]
         compatible = g_rank >= b_rank
         score = 1 if compatible else 0
         compat = "Compatible" if compatible else "Varna Mismatch — Caution"
         dosha = not compatible
         details = (f"Groom Varna: {g_varna} (rank {g_rank}) | Bride Varna: {b_varna} (rank {b_rank}). "
-                   f"Groom varna should be ≥ Bride varna. {'✅ Compatible' if compatible else '⚠️ Mismatch'}.")
+                   f"Groom varna should be ≥ Bride varna. {'✅ Compatible' if compatible else '⚠️ Mismatch'}."
+                   if self.with_details else "")
         return MatchResult("Varna Porutham", "வர்ண பொருத்தம்", score, 1, compat, details, False, "Spiritual", dosha)
 
     # ──────────────────────────────────────────────
     # 10. NADI PORUTHAM
     # ──────────────────────────────────────────────
+    @register_porutham("Nadi Porutham", depends="star")
     def calc_nadi(self) -> MatchResult:
         g_nadi = self.groom_star["nadi"]
         b_nadi = self.bride_star["nadi"]
-        result = NADI_TABLE.get((g_nadi, b_nadi), {"score": 0, "compatibility": "Unknown"})
+        result = (NADI_MATRIX[STAR_NADI[self.groom_star["id"] - 1]][STAR_NADI[self.bride_star["id"] - 1]]
+                  or {"score": 0, "compatibility": "Unknown"})
         score = result["score"]
         compat = result["compatibility"]
         dosha = score == 0
         details = (f"Groom Nadi: {g_nadi} | Bride Nadi: {b_nadi}. "
-                   f"{'⚠️ NADI DOSHA — Same Nadi! Health issues & lineage concerns.' if dosha else '✅ Different Nadi — Excellent health compatibility!'}")
+                   f"{'⚠️ NADI DOSHA — Same Nadi! Health issues & lineage concerns.' if dosha else '✅ Different Nadi — Excellent health compatibility!'}"
+                   if self.with_details else "")
         return MatchResult("Nadi Porutham", "நாடி பொருத்தம்", score, 8, compat, details, True, "Health & Lineage", dosha)
 
     # ──────────────────────────────────────────────
@@ -272,11 +487,11 @@ class AstroMatchingEngine:
 
         lord_compat = ""
         if g_navamsa_rasi and b_navamsa_rasi:
-            g_lord = g_navamsa_rasi["lord"]
-            b_lord = b_navamsa_rasi["lord"]
-            if b_lord in PLANET_FRIENDS.get(g_lord, []):
+            g_code = RASI_LORD[g_navamsa_rasi["id"] - 1]
+            b_code = RASI_LORD[b_navamsa_rasi["id"] - 1]
+            if PLANET_FRIEND_MATRIX[g_code][b_code]:
                 lord_compat = "Friendly — Excellent Navamsa harmony"
-            elif b_lord in PLANET_ENEMIES.get(g_lord, []):
+            elif PLANET_ENEMY_MATRIX[g_code][b_code]:
                 lord_compat = "Enemy — Navamsa tension"
             else:
                 lord_compat = "Neutral — Acceptable Navamsa"
@@ -291,57 +506,38 @@ class AstroMatchingEngine:
     # ──────────────────────────────────────────────
     # MAIN CALCULATE
     # ──────────────────────────────────────────────
-    def calculate_all(self) -> dict:
-        calculators = [
-            self.calc_dina,
-            self.calc_gana,
-            self.calc_mahendra,
-            self.calc_stree_deerga,
-            self.calc_yoni,
-            self.calc_rasi,
-            self.calc_rajju,
-            self.calc_vedha,
-            self.calc_varna,
-            self.calc_nadi,
-        ]
-        self.results = [fn() for fn in calculators]
+    def calculate_all(self, with_details: bool = True) -> dict:
+        """
+        Run every registered Porutham and build the summary.
+        with_details=False leaves every result's "details" empty — for ranking,
+        filtering and export callers that only need scores.
+        """
+        self.with_details = with_details
+        rules = PORUTHAM_REGISTRY
+        if _profiling:
+            self.results = [_run_profiled(rule, self) for rule in rules]
+        else:
+            self.results = [rule.fn(self) for rule in rules]
 
+        raw_max = _registry_totals["raw_max"]
+        max_weighted = _registry_totals["max_weighted"]
         raw_score = sum(r.score for r in self.results)
-        weighted_score = sum(
-            r.score * next(p["weight"] for p in PORUTHAMS if p["name"] == r.name)
-            for r in self.results
-        )
-        max_weighted = sum(
-            p["max_score"] * p["weight"] for p in PORUTHAMS
-        )
+        weighted_score = sum(r.score * rule.weight for r, rule in zip(self.results, rules))
         final_percentage = round((weighted_score / max_weighted) * 100, 1)
-        raw_percentage = round((raw_score / TOTAL_MAX_SCORE) * 100, 1)
+        raw_percentage = round((raw_score / raw_max) * 100, 1)
 
         critical_doshas = [r for r in self.results if r.dosha and r.is_critical]
         minor_doshas = [r for r in self.results if r.dosha and not r.is_critical]
         all_doshas = [r for r in self.results if r.dosha]
 
-        if final_percentage >= 80 and not critical_doshas:
-            verdict = "Excellent Match ✨"
-            verdict_color = "green"
-        elif final_percentage >= 65 and len(critical_doshas) <= 1:
-            verdict = "Good Match 👍"
-            verdict_color = "blue"
-        elif final_percentage >= 50:
-            verdict = "Average Match — Consult Astrologer 🔍"
-            verdict_color = "orange"
-        else:
-            verdict = "Poor Match ⚠️"
-            verdict_color = "red"
-
-        # Override if Nadi or Rajju Dosha (most critical)
-        for r in critical_doshas:
-            if r.name in ["Nadi Porutham", "Rajju Porutham"] and r.score == 0:
-                verdict = f"⚠️ Critical Dosha: {r.name} — Strongly Caution"
-                verdict_color = "red"
-                break
+        # Nadi or Rajju Dosha with zero score overrides the tier (most critical)
+        severe = next((r.name for r in critical_doshas
+                       if r.name in SEVERE_DOSHAS and r.score == 0), None)
+        verdict, verdict_color = VERDICTS[verdict_code(final_percentage, len(critical_doshas), severe)]
 
         padham_analysis = self.calc_padham_analysis()
+        # Percentiles describe the built-in poruthams only
+        builtin_only = len(rules) == N_BUILTIN_PORUTHAMS
 
         self.summary = {
             "groom": self.groom,
@@ -352,11 +548,13 @@ class AstroMatchingEngine:
             "bride_rasi_details": self.bride_rasi,
             "results": [r.to_dict() for r in self.results],
             "raw_score": raw_score,
-            "raw_max": TOTAL_MAX_SCORE,
+            "raw_max": raw_max,
             "raw_percentage": raw_percentage,
+            "raw_percentile": raw_percentile(raw_score) if builtin_only else None,
             "weighted_score": round(weighted_score, 2),
             "max_weighted": round(max_weighted, 2),
             "final_percentage": final_percentage,
+            "percentile": percentile(final_percentage) if builtin_only else None,
             "verdict": verdict,
             "verdict_color": verdict_color,
             "critical_doshas": [r.name for r in critical_doshas],
@@ -365,3 +563,7 @@ class AstroMatchingEngine:
             "padham_analysis": padham_analysis,
         }
         return self.summary
+
+
+# Rules registered by this module; anything beyond is a regional extension
+N_BUILTIN_PORUTHAMS = len(PORUTHAM_REGISTRY)
@@ -0,0 +1,135 @@
+"""
+partner_index.py — Top-K partner search over a large candidate pool
+Candidates are bucketed by their (star, padham, rasi) profile key. Every
+candidate in a bucket scores identically against a given person, so a search
+ranks at most 1296 buckets with one vectorized score_matrix() call and then
+expands the winning buckets in order — independent of the pool size.
+"""
+
+import numpy as np
+
+from matching_engine import VERDICTS
+from score_tables import N_STARS, N_PADHAMS, N_RASIS, profile_key, key_profile
+from batch_engine import score_matrix, ALL_PROFILES, CRITICAL_MASK, dosha_names
+from dosha_filters import DoshaFilter
+
+
+class PartnerIndex:
+    """
+    Pool of candidates of one role ("bride" or "groom").
+    Searching with a person of the opposite role returns the best-scoring candidates.
+    """
+
+    def __init__(self, role: str = "bride"):
+        if role not in ("bride", "groom"):
+            raise ValueError("role must be 'bride' or 'groom'.")
+        self.role = role
+        self._buckets: dict[int, dict] = {}   # profile key → {candidate_id: None} (ordered set)
+        self._key_of: dict = {}               # candidate_id → profile key
+        self._keys = None                     # cached sorted array of occupied keys
+
+    def __len__(self) -> int:
+        return len(self._key_of)
+
+    def __contains__(self, candidate_id) -> bool:
+        return candidate_id in self._key_of
+
+    def add(self, candidate_id, star_id: int, padham: int, rasi_id: int) -> None:
+        """Add or move a candidate. Raises ValueError for an out-of-range profile."""
+        if not 1 <= star_id <= N_STARS:
+            raise ValueError(f"star_id must be between 1 and {N_STARS}.")
+        if not 1 <= padham <= N_PADHAMS:
+            raise ValueError(f"padham must be between 1 and {N_PADHAMS}.")
+        if not 1 <= rasi_id <= N_RASIS:
+            raise ValueError(f"rasi_id must be between 1 and {N_RASIS}.")
+        if candidate_id in self._key_of:
+            self.remove(candidate_id)
+        key = profile_key(star_id, padham, rasi_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {}
+            self._keys = None
+        bucket[candidate_id] = None
+        self._key_of[candidate_id] = key
+
+    def add_many(self, rows) -> None:
+        """rows: iterable of (candidate_id, star_id, padham, rasi_id)."""
+        for candidate_id, star_id, padham, rasi_id in rows:
+            self.add(candidate_id, star_id, padham, rasi_id)
+
+    def remove(self, candidate_id) -> None:
+        key = self._key_of.pop(candidate_id)
+        bucket = self._buckets[key]
+        del bucket[candidate_id]
+        if not bucket:
+            del self._buckets[key]
+            self._keys = None
+
+    def _occupied_keys(self) -> np.ndarray:
+        if self._keys is None:
+            self._keys = np.array(sorted(self._buckets), dtype=np.int64)
+        return self._keys
+
+    def rank_buckets(self, star_id: int, padham: int, rasi_id: int,
+                     exclude_critical: bool = False, exclude_doshas=(),
+                     min_percentage: float = 0) -> list:
+        """
+        Score the person against every occupied bucket that passes the dosha filter.
+        Returns [(key, final_percentage, weighted_score, verdict_code, dosha_mask)],
+        best first; ties are broken by profile key so results are stable.
+        """
+        person_role = "groom" if self.role == "bride" else "bride"
+        keys = self._occupied_keys()
+        dosha_filter = DoshaFilter(exclude_doshas, exclude_critical)
+        if dosha_filter:
+            keys = keys[dosha_filter.allowed_key_array(star_id, rasi_id, person_role)[keys]]
+        if not len(keys):
+            return []
+
+        person = [(star_id, padham, rasi_id)]
+        profiles = ALL_PROFILES[keys]
+        if person_role == "groom":
+            m = {name: a[0] for name, a in score_matrix(person, profiles).items()}
+        else:
+            m = {name: a[:, 0] for name, a in score_matrix(profiles, person).items()}
+
+        idx = np.flatnonzero(m["final_percentage"] >= min_percentage)
+        order = idx[np.lexsort((keys[idx], -m["final_percentage"][idx]))]
+        return list(zip(keys[order].tolist(),
+                        m["final_percentage"][order].tolist(),
+                        m["weighted_score"][order].tolist(),
+                        m["verdict_code"][order].tolist(),
+                        m["dosha_mask"][order].tolist()))
+
+    def search(self, star_id: int, padham: int, rasi_id: int, k: int = 10,
+               exclude_critical: bool = False, exclude_doshas=(),
+               min_percentage: float = 0) -> list:
+        """
+        K best candidates for the person (star_id, padham, rasi_id).
+        exclude_critical drops any candidate with a summary['critical_doshas'] entry;
+        exclude_doshas is a list of porutham names that must be dosha-free.
+        Raises ValueError when k is less than 1.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        hits = []
+        for key, pct, weighted, code, mask in self.rank_buckets(
+                star_id, padham, rasi_id, exclude_critical, exclude_doshas, min_percentage):
+            verdict, verdict_color = VERDICTS[code]
+            c_star, c_padham, c_rasi = key_profile(key)
+            for candidate_id in self._buckets[key]:
+                hits.append({
+                    "candidate_id": candidate_id,
+                    "star_id": c_star,
+                    "padham": c_padham,
+                    "rasi_id": c_rasi,
+                    "final_percentage": pct,
+                    "weighted_score": weighted,
+                    "verdict": verdict,
+                    "verdict_color": verdict_color,
+                    "critical_doshas": dosha_names(mask & CRITICAL_MASK),
+                    "minor_doshas": dosha_names(mask & ~CRITICAL_MASK),
+                })
+                if len(hits) >= k:
+                    return hits
+        return hits
@@ -0,0 +1,100 @@
+"""
+percentiles.py — Where a match sits among all possible pairings
+percentile_table.json holds, for every final_percentage (in 0.1 steps) and
+every raw score, how many of the 1296 × 1296 groom/bride (star, padham, rasi)
+combinations score strictly lower. A percentile is then one list index.
+
+The table is versioned with MASTER_DATA_VERSION and ENGINE_VERSION; a stale
+table is rebuilt in memory (with a warning) until it is regenerated with
+`python percentiles.py`.
+"""
+
+import os
+import warnings
+
+from master_data import MASTER_DATA_VERSION, TOTAL_MAX_SCORE
+
+
+# json / pathlib are imported where used: the engine imports this module on
+# every start, and they would roughly double its import time
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "percentile_table.json")
+
+_table = None
+
+
+def build_table() -> dict:
+    """Count every combination's final_percentage and raw score (padham never changes either)."""
+    import numpy as np
+    from matching_engine import ENGINE_VERSION
+    from score_tables import N_PADHAMS, N_KEYS
+    from batch_engine import FINAL_PCT_TABLE, STAR_SCORE_TENSOR, RASI_SCORE_TABLE
+
+    raw = STAR_SCORE_TENSOR.sum(axis=-1, dtype=np.int64)[:, :, None, None] + RASI_SCORE_TABLE
+    pct_x10 = np.rint(FINAL_PCT_TABLE * 10).astype(np.int64).ravel()
+    per_cell = N_PADHAMS * N_PADHAMS   # (star, rasi) cells each stand for 4 × 4 padham pairs
+
+    def below(values: np.ndarray, top: int) -> list:
+        counts = np.bincount(values, minlength=top + 1) * per_cell
+        return np.concatenate(([0], np.cumsum(counts)[:-1])).tolist()
+
+    return {
+        "master_data_version": MASTER_DATA_VERSION,
+        "engine_version": ENGINE_VERSION,
+        "total": N_KEYS * N_KEYS,
+        "final_pct_below": below(pct_x10, 1000),
+        "raw_below": below(raw.ravel(), TOTAL_MAX_SCORE),
+    }
+
+
+def write_table(path=TABLE_PATH):
+    import json
+    from pathlib import Path
+    path = Path(path)
+    path.write_text(json.dumps(build_table(), separators=(",", ":")) + "\n")
+    return path
+
+
+def _load() -> dict:
+    """Load (or rebuild) the table once and precompute every percentile value."""
+    global _table, _by_x10, _by_raw
+    if _table is None:
+        import json
+        from matching_engine import ENGINE_VERSION
+        table = None
+        if os.path.exists(TABLE_PATH):
+            with open(TABLE_PATH, encoding="utf-8") as f:
+                table = json.load(f)
+        if table is None or (table["master_data_version"], table["engine_version"]) != \
+                (MASTER_DATA_VERSION, ENGINE_VERSION):
+            warnings.warn(f"{os.path.basename(TABLE_PATH)} is missing or stale — rebuilding in memory; "
+                          f"regenerate it with `python percentiles.py`.")
+            table = build_table()
+        total = table["total"]
+        # Shared float objects: a lookup allocates nothing the summary keeps
+        _by_x10 = [round(n * 100 / total, 1) for n in table["final_pct_below"]]
+        _by_raw = [round(n * 100 / total, 1) for n in table["raw_below"]]
+        _table = table
+    return _table
+
+
+_by_x10 = None   # percentile() per final_percentage * 10
+_by_raw = None   # raw_percentile() per raw score
+
+
+def percentile(final_percentage: float) -> float:
+    """Share (%) of all groom/bride combinations with a lower final_percentage."""
+    if _by_x10 is None:
+        _load()
+    return _by_x10[round(final_percentage * 10)]
+
+
+def raw_percentile(raw_score: int) -> float:
+    """Share (%) of all groom/bride combinations with a lower raw score."""
+    if _by_raw is None:
+        _load()
+    return _by_raw[raw_score]
+
+
+if __name__ == "__main__":
+    out = write_table()
+    print(f"Wrote {out} (data version {MASTER_DATA_VERSION})")
@@ -0,0 +1,194 @@
+"""
+result_classes.py — Equivalence classes of match results
+Many pairs produce exactly the same scores-only result vector (the
+calculate_all(with_details=False) results). Star pairs collapse into a few
+hundred star classes and rasi pairs into a handful of rasi classes; a match
+class is one (star class, rasi class) combination, so every groom × bride
+profile pair maps to a small uint16 class id and MATCH_CLASSES holds the
+payload once per class.
+
+    python result_classes.py [path]    # write the 1296 × 1296 class-id file
+"""
+
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from master_data import MASTER_DATA_VERSION, TOTAL_MAX_SCORE
+from matching_engine import ENGINE_VERSION, VERDICTS, SEVERE_DOSHAS, verdict_code
+from score_tables import (
+    STAR_RESULTS_BRIEF, RASI_RESULTS_BRIEF, RASI_INDEX, WEIGHTS, MAX_WEIGHTED,
+    N_STARS, N_RASIS, N_KEYS, profile_key,
+)
+from batch_engine import as_profiles
+
+
+# ─────────────────────────────────────────────────────────────
+# CLASS TABLES
+# Class ids are assigned in first-seen, row-major order, so they are stable
+# for a given ENGINE_VERSION and MASTER_DATA_VERSION.
+# ─────────────────────────────────────────────────────────────
+
+def _classify(rows) -> tuple:
+    """(class id per cell as uint16 array, distinct cells in id order)."""
+    ids, classes, class_of = {}, [], []
+    for row in rows:
+        out = []
+        for cell in row:
+            key = tuple(cell.items()) if isinstance(cell, dict) else tuple(tuple(r.items()) for r in cell)
+            if key not in ids:
+                ids[key] = len(classes)
+                classes.append(cell)
+            out.append(ids[key])
+        class_of.append(out)
+    return np.array(class_of, dtype=np.uint16), tuple(classes)
+
+
+# STAR_CLASS_OF: (27, 27) class ids into STAR_CLASSES, the distinct brief star cells
+STAR_CLASS_OF, STAR_CLASSES = _classify(STAR_RESULTS_BRIEF)
+# RASI_CLASS_OF: (12, 12) class ids into RASI_CLASSES, the distinct brief Rasi results
+RASI_CLASS_OF, RASI_CLASSES = _classify(RASI_RESULTS_BRIEF)
+N_MATCH_CLASSES = len(STAR_CLASSES) * len(RASI_CLASSES)
+
+
+def _match_payload(star_cell: tuple, rasi_result: dict) -> dict:
+    """Everything in a scores-only summary that depends on the results alone."""
+    cell = star_cell[:RASI_INDEX] + (rasi_result,) + star_cell[RASI_INDEX:]
+    raw_score = sum(r["score"] for r in cell)
+    weighted_score = sum(r["score"] * w for r, w in zip(cell, WEIGHTS))
+    final_percentage = round((weighted_score / MAX_WEIGHTED) * 100, 1)
+    critical = [r["name"] for r in cell if r["dosha"] and r["is_critical"]]
+    minor = [r["name"] for r in cell if r["dosha"] and not r["is_critical"]]
+    severe = next((r["name"] for r in cell if r["dosha"] and r["is_critical"]
+                   and r["name"] in SEVERE_DOSHAS and r["score"] == 0), None)
+    verdict, verdict_color = VERDICTS[verdict_code(final_percentage, len(critical), severe)]
+    return {
+        "results": list(cell),
+        "raw_score": raw_score,
+        "raw_percentage": round((raw_score / TOTAL_MAX_SCORE) * 100, 1),
+        "weighted_score": round(weighted_score, 2),
+        "final_percentage": final_percentage,
+        "verdict": verdict,
+        "verdict_color": verdict_color,
+        "critical_doshas": critical,
+        "minor_doshas": minor,
+        "total_doshas": len(critical) + len(minor),
+    }
+
+
+# Match class id = star class * len(RASI_CLASSES) + rasi class
+MATCH_CLASSES = tuple(_match_payload(star_cell, rasi_result)
+                      for star_cell in STAR_CLASSES for rasi_result in RASI_CLASSES)
+
+
+# ─────────────────────────────────────────────────────────────
+# LOOKUP + AGGREGATION
+# ─────────────────────────────────────────────────────────────
+
+def match_class(groom: tuple, bride: tuple) -> int:
+    """Class id of one (star_id, padham, rasi_id) groom / bride pair."""
+    star = int(STAR_CLASS_OF[groom[0] - 1, bride[0] - 1])
+    return star * len(RASI_CLASSES) + int(RASI_CLASS_OF[groom[2] - 1, bride[2] - 1])
+
+
+def class_matrix(grooms, brides) -> np.ndarray:
+    """(N, M) uint16 class ids for every groom × bride, as score_matrix() takes them."""
+    g = as_profiles(grooms)
+    b = as_profiles(brides)
+    star = STAR_CLASS_OF[g[:, 0, None] - 1, b[None, :, 0] - 1].astype(np.uint16)
+    rasi = RASI_CLASS_OF[g[:, 2, None] - 1, b[None, :, 2] - 1]
+    return star * np.uint16(len(RASI_CLASSES)) + rasi
+
+
+def class_counts(class_ids) -> np.ndarray:
+    """How many pairs fall in each match class — group by class instead of by pair."""
+    return np.bincount(np.asarray(class_ids).ravel(), minlength=N_MATCH_CLASSES)
+
+
+def class_stats() -> dict:
+    """Class counts and the storage they replace."""
+    cube_bytes = N_KEYS * N_KEYS * 10
+    return {
+        "star_pairs": N_STARS * N_STARS,
+        "star_classes": len(STAR_CLASSES),
+        "rasi_pairs": N_RASIS * N_RASIS,
+        "rasi_classes": len(RASI_CLASSES),
+        "profile_pairs": N_KEYS * N_KEYS,
+        "match_classes": N_MATCH_CLASSES,
+        "cube_bytes": cube_bytes,
+        "class_id_bytes": N_KEYS * N_KEYS * 2,
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+# CLASS-ID FILE
+# Header (64 bytes) as compat_cube: magic 8s | format u16 | engine version u16 |
+# n_keys u16 | n classes u16 | master data version 16s | padding,
+# then [groom_key][bride_key] uint16 class ids. The class table itself is
+# rebuilt from the score tables, which the versions pin down.
+# ─────────────────────────────────────────────────────────────
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "match_classes.bin"
+MAGIC = b"ASTROCLS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHHH16s")
+HEADER_SIZE = 64
+
+
+def build_class_file(path=DEFAULT_PATH) -> Path:
+    from batch_engine import ALL_PROFILES
+    path = Path(path)
+    head = HEADER.pack(MAGIC, FORMAT_VERSION, ENGINE_VERSION, N_KEYS, N_MATCH_CLASSES,
+                       MASTER_DATA_VERSION.encode("ascii")).ljust(HEADER_SIZE, b"\0")
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(head)
+        f.write(class_matrix(ALL_PROFILES, ALL_PROFILES).astype("<u2").tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+class MatchClassFile:
+    """Read-only mmap of a class-id file; lookups return the shared class payload."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, engine, n_keys, n_classes, data_version = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a match class file (format {FORMAT_VERSION}).")
+        if (engine, data_version.decode("ascii"), n_classes) != \
+                (ENGINE_VERSION, MASTER_DATA_VERSION, N_MATCH_CLASSES):
+            self.close()
+            raise ValueError(f"{self.path} is stale — rebuild it with `python result_classes.py`.")
+        if n_keys != N_KEYS or len(self._mm) != HEADER_SIZE + n_keys * n_keys * 2:
+            self.close()
+            raise ValueError(f"{self.path} is truncated or has an unexpected shape.")
+        self.class_ids = np.frombuffer(self._mm, dtype="<u2", offset=HEADER_SIZE).reshape(N_KEYS, N_KEYS)
+
+    def close(self) -> None:
+        self.class_ids = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup_profiles(self, groom: tuple, bride: tuple) -> dict:
+        """Shared class payload (treat as read-only) for a (star_id, padham, rasi_id) pair."""
+        return MATCH_CLASSES[self.class_ids[profile_key(*groom), profile_key(*bride)]]
+
+
+if __name__ == "__main__":
+    out = build_class_file(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
+    stats = class_stats()
+    print(f"Wrote {out} ({out.stat().st_size:,} bytes): {stats['profile_pairs']:,} pairs in "
+          f"{stats['match_classes']:,} classes ({stats['star_classes']} star × {stats['rasi_classes']} rasi)")
@@ -0,0 +1,133 @@
+"""
+reverse_index.py — Best counterpart profiles for one person
+For a person's (star, padham, rasi), every one of the 1296 counterpart
+profile keys ranked by final_percentage. Padham never changes a score, so
+one sorted row per (star, rasi) and role — 324 rows — covers every person;
+rows are built once per process from the batch tables, and a query is a
+row lookup plus vectorized filters.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from master_data import NAKSHATRAS, RASIS
+from matching_engine import VERDICTS
+from score_tables import N_STARS, N_RASIS, N_KEYS, key_profile
+from batch_engine import ALL_PROFILES, CRITICAL_MASK, score_matrix, dosha_names
+from dosha_filters import DoshaFilter
+
+
+# One representative profile (padham 1) per (star, rasi) row, row = (star_id - 1) * N_RASIS + rasi_id - 1
+_ROW_PROFILES = np.array([(s, 1, r) for s in range(1, N_STARS + 1) for r in range(1, N_RASIS + 1)],
+                         dtype=np.int64)
+
+
+@lru_cache(maxsize=2)
+def sorted_index(role: str) -> dict:
+    """
+    Per-row counterpart ranking for a person of the given role.
+    Arrays are (N_STARS * N_RASIS, N_KEYS), best first, ties broken by key:
+        keys (int16), final_percentage, verdict_code, dosha_mask
+    """
+    if role not in ("groom", "bride"):
+        raise ValueError("role must be 'groom' or 'bride'.")
+    if role == "groom":
+        m = score_matrix(_ROW_PROFILES, ALL_PROFILES)
+    else:
+        m = {name: np.swapaxes(a, 0, 1) for name, a in score_matrix(ALL_PROFILES, _ROW_PROFILES).items()}
+    keys = np.broadcast_to(np.arange(N_KEYS), m["final_percentage"].shape)
+    order = np.lexsort((keys, -m["final_percentage"]), axis=-1)
+    return {
+        "keys": order.astype(np.int16),
+        "final_percentage": np.take_along_axis(m["final_percentage"], order, -1),
+        "verdict_code": np.take_along_axis(m["verdict_code"], order, -1),
+        "dosha_mask": np.take_along_axis(m["dosha_mask"], order, -1),
+    }
+
+
+def _verdict_codes(verdicts) -> list:
+    """Verdict codes from codes or verdict labels."""
+    labels = [v for v, _ in VERDICTS]
+    codes = []
+    for v in verdicts:
+        if isinstance(v, str):
+            if v not in labels:
+                raise ValueError(f"Unknown verdict '{v}'.")
+            v = labels.index(v)
+        codes.append(int(v))
+    return codes
+
+
+def best_counterparts(star_id: int, padham: int, rasi_id: int, role: str = "groom",
+                      verdicts=None, exclude_doshas=(), exclude_critical: bool = False,
+                      min_percentage: float = 0, limit: int = None) -> list:
+    """
+    Counterpart profiles for the person (star_id, padham, rasi_id), best first.
+    role is the person's side; results are profiles of the other side. padham
+    never changes the ranking and is accepted so callers can pass a full profile.
+    verdicts keeps only those verdict codes / labels (see matching_engine.VERDICTS);
+    exclude_doshas / exclude_critical work as in DoshaFilter.
+    """
+    index = sorted_index(role)
+    row = (star_id - 1) * N_RASIS + (rasi_id - 1)
+    pct = index["final_percentage"][row]
+    codes = index["verdict_code"][row]
+    masks = index["dosha_mask"][row]
+
+    keep = pct >= min_percentage
+    if verdicts is not None:
+        keep &= np.isin(codes, _verdict_codes(verdicts))
+    dosha_filter = DoshaFilter(exclude_doshas, exclude_critical)
+    if dosha_filter:
+        keep &= dosha_filter.passes(masks)
+    positions = np.flatnonzero(keep)
+    if limit is not None:
+        positions = positions[:limit]
+
+    out = []
+    for i in positions.tolist():
+        c_star, c_padham, c_rasi = key_profile(int(index["keys"][row, i]))
+        verdict, verdict_color = VERDICTS[codes[i]]
+        mask = int(masks[i])
+        out.append({
+            "key": int(index["keys"][row, i]),
+            "star_id": c_star,
+            "star_name": NAKSHATRAS[c_star - 1]["name"],
+            "padham": c_padham,
+            "rasi_id": c_rasi,
+            "rasi_name": RASIS[c_rasi - 1]["name"],
+            "final_percentage": float(pct[i]),
+            "verdict": verdict,
+            "verdict_color": verdict_color,
+            "critical_doshas": dosha_names(mask & CRITICAL_MASK),
+            "minor_doshas": dosha_names(mask & ~CRITICAL_MASK),
+        })
+    return out
+
+
+def _natural_rasis(star_id: int) -> list:
+    """The star's own rasi(s) — stars spanning two rasis list both, e.g. "Mesha/Vrishabha"."""
+    return [r.strip() for r in NAKSHATRAS[star_id - 1]["rasi"].split("/")]
+
+
+def best_counterpart_stars(star_id: int, rasi_id: int, role: str = "groom",
+                           limit: int = None, natural_rasi: bool = False, **filters) -> list:
+    """
+    Best (star, rasi) per counterpart star — "most compatible stars" —
+    as best_counterparts() rows without padham, one per star.
+    natural_rasi only considers each star with its own rasi(s) from master_data.
+    """
+    seen, out = set(), []
+    for hit in best_counterparts(star_id, 1, rasi_id, role, **filters):
+        if hit["star_id"] in seen:
+            continue
+        if natural_rasi and hit["rasi_name"] not in _natural_rasis(hit["star_id"]):
+            continue
+        seen.add(hit["star_id"])
+        hit = dict(hit)
+        del hit["padham"], hit["key"]
+        out.append(hit)
+        if limit is not None and len(out) >= limit:
+            break
+    return out
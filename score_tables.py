@@ -0,0 +1,338 @@
+"""
+score_tables.py — Compiled lookup tables for the 10 Poruthams
+Every porutham except Rasi depends only on the two nakshatra ids, and Rasi
+Porutham depends only on the two rasi ids. All results are materialized once
+at import from AstroMatchingEngine (the source of truth), so a match becomes
+a handful of table indexes instead of ten rule evaluations.
+"""
+
+from time import perf_counter_ns
+
+from master_data import (
+    NAKSHATRAS, RASIS, PORUTHAMS, TOTAL_MAX_SCORE,
+    PLANET_FRIEND_MATRIX, PLANET_ENEMY_MATRIX, RASI_LORD,
+    get_nakshatra_by_name, get_rasi_by_name, get_padham_navamsa,
+)
+from percentiles import percentile, raw_percentile
+from matching_engine import (
+    AstroMatchingEngine, MatchResult, VERDICTS, SEVERE_DOSHAS, verdict_code,
+    PORUTHAM_REGISTRY, N_BUILTIN_PORUTHAMS, rule_profiling_enabled, record_stage,
+)
+
+
+# ─────────────────────────────────────────────────────────────
+# TABLE LAYOUT
+# Star tables are indexed [groom_star_id - 1][bride_star_id - 1],
+# rasi tables [groom_rasi_id - 1][bride_rasi_id - 1].
+# Porutham order follows calculate_all(); Rasi sits at RASI_INDEX.
+# ─────────────────────────────────────────────────────────────
+
+N_STARS = len(NAKSHATRAS)   # 27
+N_RASIS = len(RASIS)        # 12
+N_PORUTHAMS = len(PORUTHAMS)  # 10
+N_PADHAMS = 4
+N_KEYS = N_STARS * N_PADHAMS * N_RASIS  # 1296 distinct (star, padham, rasi) profiles
+
+# The built-in rules, fused into the tables below. Regional rules get their own
+# rule.lookup from compile_rule() on first use.
+COMPILED_RULES = tuple(PORUTHAM_REGISTRY[:N_BUILTIN_PORUTHAMS])
+STAR_RULES = [rule for rule in COMPILED_RULES if rule.depends == "star"]
+RASI_INDEX = next(i for i, rule in enumerate(COMPILED_RULES) if rule.depends == "rasi")
+RASI_RULE = COMPILED_RULES[RASI_INDEX]
+assert len(COMPILED_RULES) == N_PORUTHAMS and len(STAR_RULES) == N_PORUTHAMS - 1
+
+MAX_WEIGHTED = sum(rule.max_score * rule.weight for rule in COMPILED_RULES)
+
+
+def profile_key(star_id: int, padham: int, rasi_id: int) -> int:
+    """Dense 0-based key for a (star, padham, rasi) profile."""
+    return ((star_id - 1) * N_PADHAMS + (padham - 1)) * N_RASIS + (rasi_id - 1)
+
+
+def key_profile(key: int) -> tuple:
+    """Inverse of profile_key() → (star_id, padham, rasi_id)."""
+    star_padham, rasi = divmod(key, N_RASIS)
+    star, padham = divmod(star_padham, N_PADHAMS)
+    return star + 1, padham + 1, rasi + 1
+
+
+def _engine_for(g_star: dict, b_star: dict, g_rasi: dict, b_rasi: dict) -> AstroMatchingEngine:
+    return AstroMatchingEngine(
+        {"name": "", "star_name": g_star["name"], "padham": 1, "rasi_name": g_rasi["name"]},
+        {"name": "", "star_name": b_star["name"], "padham": 1, "rasi_name": b_rasi["name"]},
+    )
+
+
+def _build_star_tables():
+    """27×27×9 result dicts, scores and dosha flags for the star-only poruthams."""
+    results, scores, doshas = [], [], []
+    for g_star in NAKSHATRAS:
+        r_row, s_row, d_row = [], [], []
+        for b_star in NAKSHATRAS:
+            engine = _engine_for(g_star, b_star, RASIS[0], RASIS[0])
+            cell = tuple(rule.fn(engine).to_dict() for rule in STAR_RULES)
+            r_row.append(cell)
+            s_row.append(tuple(r["score"] for r in cell))
+            d_row.append(tuple(r["dosha"] for r in cell))
+        results.append(r_row)
+        scores.append(s_row)
+        doshas.append(d_row)
+    return results, scores, doshas
+
+
+def _build_rasi_table():
+    """12×12 Rasi Porutham result dicts."""
+    star = NAKSHATRAS[0]
+    return [[RASI_RULE.fn(_engine_for(star, star, g_rasi, b_rasi)).to_dict() for b_rasi in RASIS]
+            for g_rasi in RASIS]
+
+
+STAR_RESULTS, STAR_SCORES, STAR_DOSHAS = _build_star_tables()
+RASI_RESULTS = _build_rasi_table()
+RASI_SCORES = [[r["score"] for r in row] for row in RASI_RESULTS]
+RASI_DOSHAS = [[r["dosha"] for r in row] for row in RASI_RESULTS]
+
+
+
+def _brief(r: dict) -> dict:
+    """Scores-only twin of a result dict (empty details), as calculate_all(with_details=False) gives."""
+    return MatchResult(r["name"], r["tamil"], r["score"], r["max_score"], r["compatibility"],
+                       "", r["is_critical"], r["category"], r["dosha"]).to_dict()
+
+
+STAR_RESULTS_BRIEF = [[tuple(_brief(r) for r in cell) for cell in row] for row in STAR_RESULTS]
+RASI_RESULTS_BRIEF = [[_brief(r) for r in row] for row in RASI_RESULTS]
+
+
+def _attach_lookups() -> None:
+    """Give each built-in rule its slice of the fused tables as rule.lookup."""
+    for i, rule in enumerate(STAR_RULES):
+        rule.lookup = ([[cell[i] for cell in row] for row in STAR_RESULTS],
+                       [[cell[i] for cell in row] for row in STAR_RESULTS_BRIEF])
+    RASI_RULE.lookup = (RASI_RESULTS, RASI_RESULTS_BRIEF)
+
+
+_attach_lookups()
+
+
+def compile_rule(rule) -> tuple:
+    """
+    rule.lookup for a star / rasi rule, materialized from rule.fn on first use:
+    (detailed, brief) tables indexed [groom id - 1][bride id - 1].
+    """
+    if rule.lookup is None:
+        if rule.depends == "star":
+            detailed = [[rule.fn(_engine_for(g, b, RASIS[0], RASIS[0])).to_dict() for b in NAKSHATRAS]
+                        for g in NAKSHATRAS]
+        elif rule.depends == "rasi":
+            star = NAKSHATRAS[0]
+            detailed = [[rule.fn(_engine_for(star, star, g, b)).to_dict() for b in RASIS]
+                        for g in RASIS]
+        else:
+            raise ValueError(f"Porutham '{rule.name}' needs the full engine and cannot be compiled.")
+        rule.lookup = (detailed, [[_brief(r) for r in row] for row in detailed])
+    return rule.lookup
+
+
+def _split_doshas(cell: tuple) -> tuple:
+    """(critical names before Rasi, critical names after Rasi, minor names, severe name)."""
+    head = [r for r in cell[:RASI_INDEX] if r["dosha"] and r["is_critical"]]
+    tail = [r for r in cell[RASI_INDEX:] if r["dosha"] and r["is_critical"]]
+    minor = [r["name"] for r in cell if r["dosha"] and not r["is_critical"]]
+    # Rasi is never a severe dosha, so the override is fixed by the star pair
+    severe = next((r["name"] for r in head + tail
+                   if r["name"] in SEVERE_DOSHAS and r["score"] == 0), None)
+    return ([r["name"] for r in head], [r["name"] for r in tail], minor, severe)
+
+
+# Weights in calculate_all() order
+WEIGHTS = [rule.weight for rule in COMPILED_RULES]
+
+STAR_DOSHA_SPLIT = [[_split_doshas(cell) for cell in row] for row in STAR_RESULTS]
+
+
+# ─────────────────────────────────────────────────────────────
+# NAVAMSA LORD COMPATIBILITY (Padham analysis)
+# ─────────────────────────────────────────────────────────────
+
+def _navamsa_lord_compat(g_code: int, b_code: int) -> str:
+    if PLANET_FRIEND_MATRIX[g_code][b_code]:
+        return "Friendly — Excellent Navamsa harmony"
+    if PLANET_ENEMY_MATRIX[g_code][b_code]:
+        return "Enemy — Navamsa tension"
+    return "Neutral — Acceptable Navamsa"
+
+
+NAVAMSA_COMPAT = {
+    (g["name"], b["name"]): _navamsa_lord_compat(RASI_LORD[g["id"] - 1], RASI_LORD[b["id"] - 1])
+    for g in RASIS for b in RASIS
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# COMPILED ENGINE
+# ─────────────────────────────────────────────────────────────
+
+class CompiledMatchingEngine:
+    """
+    Drop-in replacement for AstroMatchingEngine backed by the precomputed tables.
+    calculate_all() returns the same summary as the reference engine.
+    """
+
+    def __init__(self, groom: dict, bride: dict):
+        self.groom = groom
+        self.bride = bride
+        self.groom_star = get_nakshatra_by_name(groom["star_name"])
+        self.bride_star = get_nakshatra_by_name(bride["star_name"])
+        self.groom_rasi = get_rasi_by_name(groom["rasi_name"])
+        self.bride_rasi = get_rasi_by_name(bride["rasi_name"])
+        self.summary = {}
+
+    def calc_padham_analysis(self) -> dict:
+        g_padham = self.groom.get("padham", 1)
+        b_padham = self.bride.get("padham", 1)
+        g_navamsa = get_padham_navamsa(self.groom_star["id"], g_padham)
+        b_navamsa = get_padham_navamsa(self.bride_star["id"], b_padham)
+        return {
+            "groom_padham": g_padham,
+            "bride_padham": b_padham,
+            "groom_navamsa": g_navamsa,
+            "bride_navamsa": b_navamsa,
+            "navamsa_lord_compatibility": NAVAMSA_COMPAT.get((g_navamsa, b_navamsa), ""),
+        }
+
+    def _lookup(self, with_details: bool) -> tuple:
+        """(results in calculate_all() order, rasi result, star dosha split)."""
+        g = self.groom_star["id"] - 1
+        b = self.bride_star["id"] - 1
+        gr = self.groom_rasi["id"] - 1
+        br = self.bride_rasi["id"] - 1
+        if with_details:
+            star_cell = STAR_RESULTS[g][b]
+            rasi_result = RASI_RESULTS[gr][br]
+        else:
+            star_cell = STAR_RESULTS_BRIEF[g][b]
+            rasi_result = RASI_RESULTS_BRIEF[gr][br]
+        cell = star_cell[:RASI_INDEX] + (rasi_result,) + star_cell[RASI_INDEX:]
+        return cell, rasi_result, STAR_DOSHA_SPLIT[g][b]
+
+    @staticmethod
+    def _score(cell: tuple, rasi_result: dict, split: tuple) -> tuple:
+        """Totals, percentages, verdict and dosha lists for one looked-up cell."""
+        raw_score = sum(r["score"] for r in cell)
+        weighted_score = sum(r["score"] * w for r, w in zip(cell, WEIGHTS))
+        final_percentage = round((weighted_score / MAX_WEIGHTED) * 100, 1)
+        raw_percentage = round((raw_score / TOTAL_MAX_SCORE) * 100, 1)
+
+        head, tail, minor, severe = split
+        critical = head + [rasi_result["name"]] + tail if rasi_result["dosha"] else head + tail
+        verdict, verdict_color = VERDICTS[verdict_code(final_percentage, len(critical), severe)]
+        return (raw_score, raw_percentage, weighted_score, final_percentage,
+                verdict, verdict_color, critical, minor)
+
+    def _summary(self, cell: tuple, scores: tuple, raw_pctile: float, pctile: float,
+                 padham_analysis: dict, raw_max: int = TOTAL_MAX_SCORE,
+                 max_weighted: float = MAX_WEIGHTED) -> dict:
+        raw_score, raw_percentage, weighted_score, final_percentage, \
+            verdict, verdict_color, critical, minor = scores
+        return {
+            "groom": self.groom,
+            "bride": self.bride,
+            "groom_star_details": self.groom_star,
+            "bride_star_details": self.bride_star,
+            "groom_rasi_details": self.groom_rasi,
+            "bride_rasi_details": self.bride_rasi,
+            "results": list(cell),
+            "raw_score": raw_score,
+            "raw_max": raw_max,
+            "raw_percentage": raw_percentage,
+            "raw_percentile": raw_pctile,
+            "weighted_score": round(weighted_score, 2),
+            "max_weighted": round(max_weighted, 2),
+            "final_percentage": final_percentage,
+            "percentile": pctile,
+            "verdict": verdict,
+            "verdict_color": verdict_color,
+            "critical_doshas": critical,
+            "minor_doshas": list(minor),
+            "total_doshas": len(critical) + len(minor),
+            "padham_analysis": padham_analysis,
+        }
+
+    def calculate_all(self, with_details: bool = True) -> dict:
+        if len(PORUTHAM_REGISTRY) != N_PORUTHAMS:
+            # Regional rules aren't in the fused tables — go rule by rule
+            return self._calculate_registry(with_details)
+        if rule_profiling_enabled():
+            return self._calculate_profiled(with_details)
+        cell, rasi_result, split = self._lookup(with_details)
+        scores = self._score(cell, rasi_result, split)
+        self.summary = self._summary(cell, scores, raw_percentile(scores[0]), percentile(scores[3]),
+                                     self.calc_padham_analysis())
+        return self.summary
+
+    def _calculate_profiled(self, with_details: bool) -> dict:
+        """calculate_all() with each stage timed into matching_engine.STAGE_PROFILE."""
+        t0 = perf_counter_ns()
+        cell, rasi_result, split = self._lookup(with_details)
+        t1 = perf_counter_ns()
+        scores = self._score(cell, rasi_result, split)
+        t2 = perf_counter_ns()
+        raw_pctile, pctile = raw_percentile(scores[0]), percentile(scores[3])
+        t3 = perf_counter_ns()
+        padham_analysis = self.calc_padham_analysis()
+        t4 = perf_counter_ns()
+        self.summary = self._summary(cell, scores, raw_pctile, pctile, padham_analysis)
+        t5 = perf_counter_ns()
+        record_stage("compiled: table lookup", t1 - t0)
+        record_stage("compiled: scoring + verdict", t2 - t1)
+        record_stage("compiled: percentiles", t3 - t2)
+        record_stage("compiled: padham analysis", t4 - t3)
+        record_stage("compiled: summary", t5 - t4)
+        return self.summary
+
+    def _calculate_registry(self, with_details: bool) -> dict:
+        """
+        calculate_all() with regional rules registered: every star / rasi rule is
+        read from its compiled rule.lookup, and only rules that need the full
+        engine are evaluated on a reference engine.
+        """
+        profiling = rule_profiling_enabled()
+        t0 = perf_counter_ns() if profiling else 0
+        rules = PORUTHAM_REGISTRY
+        ids = {"star": (self.groom_star["id"] - 1, self.bride_star["id"] - 1),
+               "rasi": (self.groom_rasi["id"] - 1, self.bride_rasi["id"] - 1)}
+        slot = 0 if with_details else 1
+        reference = None
+        cell = []
+        for rule in rules:
+            if rule.depends is None:
+                if reference is None:
+                    reference = AstroMatchingEngine(self.groom, self.bride)
+                    reference.with_details = with_details
+                cell.append(rule.fn(reference).to_dict())
+            else:
+                g, b = ids[rule.depends]
+                cell.append(compile_rule(rule)[slot][g][b])
+        t1 = perf_counter_ns() if profiling else 0
+
+        raw_max = sum(rule.max_score for rule in rules)
+        max_weighted = sum(rule.max_score * rule.weight for rule in rules)
+        raw_score = sum(r["score"] for r in cell)
+        weighted_score = sum(r["score"] * rule.weight for r, rule in zip(cell, rules))
+        final_percentage = round((weighted_score / max_weighted) * 100, 1)
+        raw_percentage = round((raw_score / raw_max) * 100, 1)
+        critical = [r["name"] for r in cell if r["dosha"] and r["is_critical"]]
+        minor = [r["name"] for r in cell if r["dosha"] and not r["is_critical"]]
+        severe = next((r["name"] for r in cell if r["dosha"] and r["is_critical"]
+                       and r["name"] in SEVERE_DOSHAS and r["score"] == 0), None)
+        verdict, verdict_color = VERDICTS[verdict_code(final_percentage, len(critical), severe)]
+        scores = (raw_score, raw_percentage, weighted_score, final_percentage,
+                  verdict, verdict_color, critical, minor)
+        # Percentiles describe the built-in poruthams only
+        self.summary = self._summary(cell, scores, None, None, self.calc_padham_analysis(),
+                                     raw_max, max_weighted)
+        if profiling:
+            record_stage("compiled: registry lookup", t1 - t0)
+            record_stage("compiled: registry scoring + summary", perf_counter_ns() - t1)
+        return self.summary
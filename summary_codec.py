@@ -0,0 +1,95 @@
+"""
+summary_codec.py — Bit-packed binary encoding of a calculate_all() summary
+A summary is fully determined by the two (star, padham, rasi) profiles, the
+two names and whether details were rendered. encode_summary() keeps exactly
+that, plus the scores and dosha bits as a check, in 14 bytes plus the names;
+decode_summary() rebuilds the identical summary dict with the compiled
+engine. Suitable for DB columns, cache values and inter-process transfer.
+"""
+
+import struct
+
+from master_data import get_nakshatra_by_id, get_rasi_by_id, get_nakshatra_by_name, get_rasi_by_name
+from matching_engine import ENGINE_VERSION
+from score_tables import N_PORUTHAMS, profile_key, key_profile, CompiledMatchingEngine
+
+
+# ─────────────────────────────────────────────────────────────
+# LAYOUT (little-endian)
+#   codec version u8 | engine version u8 |
+#   groom key u11 · bride key u11 · dosha mask u10 (one u32) |
+#   scores 5 bytes (two 4-bit scores per byte) | flags u8 |
+#   groom name (u8 length + UTF-8) | bride name (u8 length + UTF-8)
+# ─────────────────────────────────────────────────────────────
+
+CODEC_VERSION = 1
+_FIXED = struct.Struct("<BBI5sB")
+_WITH_DETAILS = 0x01
+MAX_NAME_BYTES = 255
+
+
+def _profile(person: dict) -> int:
+    star = get_nakshatra_by_name(person["star_name"])
+    rasi = get_rasi_by_name(person["rasi_name"])
+    if star is None or rasi is None:
+        raise ValueError(f"Unknown star or rasi: {person['star_name']!r} / {person['rasi_name']!r}")
+    return profile_key(star["id"], person.get("padham", 1), rasi["id"])
+
+
+def _pack_name(name: str) -> bytes:
+    raw = name.encode("utf-8")
+    if len(raw) > MAX_NAME_BYTES:
+        raise ValueError(f"Name longer than {MAX_NAME_BYTES} UTF-8 bytes: {name[:20]!r}...")
+    return bytes((len(raw),)) + raw
+
+
+def encode_summary(summary: dict) -> bytes:
+    """Compact bytes for a calculate_all() summary of the 10 built-in poruthams."""
+    results = summary["results"]
+    if len(results) != N_PORUTHAMS:
+        raise ValueError(f"Only {N_PORUTHAMS}-porutham summaries can be encoded.")
+    scores = [r["score"] for r in results]
+    dosha_mask = sum(1 << i for i, r in enumerate(results) if r["dosha"])
+    keys = _profile(summary["groom"]) | (_profile(summary["bride"]) << 11) | (dosha_mask << 22)
+    packed = bytes(scores[i] | (scores[i + 1] << 4) for i in range(0, N_PORUTHAMS, 2))
+    flags = _WITH_DETAILS if any(r["details"] for r in results) else 0
+    return (_FIXED.pack(CODEC_VERSION, ENGINE_VERSION, keys, packed, flags)
+            + _pack_name(summary["groom"]["name"]) + _pack_name(summary["bride"]["name"]))
+
+
+def _person(key: int, name: str) -> dict:
+    star, padham, rasi = key_profile(key)
+    return {"name": name, "star_name": get_nakshatra_by_id(star)["name"],
+            "padham": padham, "rasi_name": get_rasi_by_id(rasi)["name"]}
+
+
+def decode_summary(data: bytes) -> dict:
+    """
+    The calculate_all() summary encoded by encode_summary(). groom / bride come
+    back as canonical person dicts (name, star_name, padham, rasi_name).
+    Raises ValueError for a foreign codec or engine version, or if the stored
+    scores no longer match what the engine computes.
+    """
+    codec, engine, keys, packed, flags = _FIXED.unpack_from(data, 0)
+    if codec != CODEC_VERSION:
+        raise ValueError(f"Unsupported summary codec version {codec}.")
+    if engine != ENGINE_VERSION:
+        raise ValueError(f"Summary was encoded by engine version {engine}, this is {ENGINE_VERSION}.")
+    offset = _FIXED.size
+    names = []
+    for _ in range(2):
+        n = data[offset]
+        names.append(bytes(data[offset + 1:offset + 1 + n]).decode("utf-8"))
+        offset += 1 + n
+
+    groom = _person(keys & 0x7FF, names[0])
+    bride = _person((keys >> 11) & 0x7FF, names[1])
+    summary = CompiledMatchingEngine(groom, bride).calculate_all(bool(flags & _WITH_DETAILS))
+
+    results = summary["results"]
+    scores = [r["score"] for r in results]
+    dosha_mask = sum(1 << i for i, r in enumerate(results) if r["dosha"])
+    if bytes(scores[i] | (scores[i + 1] << 4) for i in range(0, N_PORUTHAMS, 2)) != packed \
+            or dosha_mask != keys >> 22:
+        raise ValueError("Encoded scores do not match the current engine — master data changed.")
+    return summary
@@ -0,0 +1,21 @@
+import pytest
+
+from partner_index import PartnerIndex
+
+
+@pytest.fixture
+def index():
+    idx = PartnerIndex("bride")
+    idx.add_many([(1, 1, 1, 1), (2, 5, 2, 3), (3, 12, 4, 6)])
+    return idx
+
+
+def test_search_returns_at_most_k(index):
+    assert len(index.search(1, 1, 1, k=2)) == 2
+    assert len(index.search(1, 1, 1, k=10)) == 3
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_search_rejects_k_below_one(index, k):
+    with pytest.raises(ValueError, match="k must be at least 1"):
+        index.search(1, 1, 1, k=k)